@@ -0,0 +1,115 @@
+"""Boot cost of motor_library: import time, heap after import, time to ready.
+
+On the board (after copying the library, .py or .mpy):
+
+    mpremote run host/bench_boot.py
+
+prints the real import time and gc.mem_free() before/after. On the host
+it runs against the simulated board and reports virtual time spent on
+peripheral access during import, I2C bytes sent, CPython heap allocated
+by the import and the virtual time until main.py waits for START.
+--ref compares with motor_library.py from a git revision.
+
+    python host/bench_boot.py [--ref HEAD~1]
+"""
+
+import sys
+import time
+
+
+def board():
+    import gc
+    gc.collect()
+    free0 = gc.mem_free()
+    t0 = time.ticks_us()
+    import motor_library
+    t1 = time.ticks_us()
+    gc.collect()
+    free1 = gc.mem_free()
+    print("import motor_library: %d us" % time.ticks_diff(t1, t0))
+    print("heap: %d free before, %d after, %d used"
+          % (free0, free1, free0 - free1))
+    if motor_library._load_config_id() is not None:
+        t0 = time.ticks_us()
+        motor_library.set_motor_config()
+        print("set_motor_config(): %d us"
+              % time.ticks_diff(time.ticks_us(), t0))
+
+
+def measure():
+    import builtins
+    import tracemalloc
+
+    import machine
+    import sim
+    import simhw
+
+    sim.install()
+    tracemalloc.start()
+    t0 = simhw.clock.now_us
+    import motor_library  # noqa: F401
+    import_us = simhw.clock.now_us - t0
+    heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    i2c = machine.i2c_bytes
+
+    sim.install()
+    ready = []
+    real_print = builtins.print
+
+    def spy(*args, **kw):
+        if not ready and args and "Waiting for START" in str(args[0]):
+            ready.append(simhw.clock.now_us)
+        real_print(*args, **kw)
+
+    builtins.print = spy
+    try:
+        sim.run_main(2.0)
+    finally:
+        builtins.print = real_print
+    return import_us, i2c, heap, ready[0] if ready else None
+
+
+def _use_ref(rev):
+    import os
+    import subprocess
+    import tempfile
+
+    import sim
+    src = subprocess.run(["git", "show", "%s:motor_library.py" % rev],
+                         cwd=sim.REPO_DIR, capture_output=True, check=True).stdout
+    d = tempfile.mkdtemp(prefix="erc-boot-ref-")
+    with open(os.path.join(d, "motor_library.py"), "wb") as f:
+        f.write(src)
+    sys.path.insert(0, d)
+    return d
+
+
+def main(argv=None):
+    import argparse
+    import io
+    import contextlib
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--ref", help="also measure motor_library.py at this git revision")
+    args = ap.parse_args(argv)
+
+    runs = [("current", None)]
+    if args.ref:
+        runs.append((args.ref, args.ref))
+    print("%-12s %12s %10s %12s %14s" % ("library", "import (us)", "i2c bytes",
+                                         "heap (bytes)", "ready at (ms)"))
+    for label, rev in runs:
+        d = _use_ref(rev) if rev else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            import_us, i2c, heap, ready = measure()
+        if d:
+            sys.path.remove(d)
+        print("%-12s %12d %10d %12d %14s" % (label, import_us, i2c, heap,
+              "-" if ready is None else "%.1f" % (ready / 1000)))
+
+
+if sys.implementation.name == "micropython":
+    board()
+elif __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Press-to-zero-duty latency of the STOP button, on the simulated board.
+
+For each scenario the robot is driving at full speed when STOP (pin 0) is
+pressed at a spread of offsets. Latency is the virtual time from the press
+until every motor PWM reads zero. Each scenario runs twice: with the IRQ
+handler installed by motor_library, and with it detached so only the
+check_stop() polling path is left. The handler is a soft IRQ, so as on the
+board it waits for a running I2C transfer or timer callback to return.
+
+    python host/bench_estop.py [--config SIX] [--presses 20]
+"""
+
+import sim
+import simhw
+
+
+def _drive_wait(ml):
+    ml.FW(100)
+    ml.wait(5)
+
+
+def _drive_movement(ml):
+    ml.movement("FW", 100, 5)
+
+
+def _drive_buzz(ml):
+    ml.FW(100)
+    ml.buzz(2, 10)
+    ml.wait(3)
+
+
+def _drive_oled(ml):
+    ml.oled_rate(0)         # draw inline, i.e. the blocking worst case
+    ml.FW(100)
+    for i in range(1000):
+        ml.oled_status("Speed", str(i), "", "")
+
+
+SCENARIOS = (
+    ("wait", _drive_wait),
+    ("movement", _drive_movement),
+    ("buzz", _drive_buzz),
+    ("oled_status", _drive_oled),
+)
+
+
+def _zero_time(ml, t_press):
+    """First log time >= t_press at which every motor PWM is at zero."""
+    gpios = [m["pwm"].gpio for m in ml.motors.values()]
+    duty = {}
+    for t, kind, pin, value in simhw.log:
+        if kind != "duty" or pin not in gpios:
+            continue
+        duty[pin] = value
+        if t >= t_press and all(not duty.get(g) for g in gpios):
+            return t
+    return None
+
+
+def measure(config, body, offset_s, use_irq):
+    ml = sim.load_library(config)
+    if not use_irq:
+        ml.button_stop.irq(handler=None)
+    ml._running = True
+    t0 = simhw.clock.now_us
+    t_press = t0 + int(offset_s * 1000000)
+    sim.press(sim.STOP_PIN, at=t_press / 1000000, hold=0.2)
+    sim.press(sim.START_PIN, at=t_press / 1000000 + 0.5)
+    simhw.set_deadline(10)
+    try:
+        body(ml)
+    except (simhw.SimReset, simhw.SimTimeout):
+        pass
+    simhw.clock.deadline_us = None
+    t_zero = _zero_time(ml, t_press)
+    return None if t_zero is None else t_zero - t_press
+
+
+def _fmt(samples):
+    if None in samples:
+        return "%10s %10s" % ("missed", "")
+    return "%10.3f %10.3f" % (max(samples) / 1000, sum(samples) / len(samples) / 1000)
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--config", default="SIX")
+    ap.add_argument("--presses", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    offsets = [0.1 + 1.7 * i / args.presses for i in range(args.presses)]
+    print("STOP press-to-zero-duty latency, ms (config %s, %d presses)"
+          % (args.config, args.presses))
+    print("%-12s %10s %10s   %10s %10s" % ("scenario", "irq max", "irq mean",
+                                           "poll max", "poll mean"))
+    for name, body in SCENARIOS:
+        irq = [measure(args.config, body, o, True) for o in offsets]
+        poll = [measure(args.config, body, o, False) for o in offsets]
+        print("%-12s %s   %s" % (name, _fmt(irq), _fmt(poll)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Benchmark motor_library's hot paths on the simulator, with a JSON baseline.
+
+For every benchmark a fresh motor_library runs on the simulated board and each
+call is measured three ways:
+
+  virtual_us  simulated ESP32 time per call, from the peripheral costs in
+              simhw.COST_US (for movement/wait: time beyond the duration)
+  lines       library source lines executed per call, a stand-in for
+              interpreter time that peripheral costs do not see
+  host_us     CPython wall time per call, informational only
+
+virtual_us and lines are deterministic, so they are compared with the
+baseline; host_us depends on the machine running the suite. main_loop
+runs main.py with START held and sensor_3 on the line and reports loop
+iterations per virtual second.
+
+    python host/bench_suite.py -o results.json
+    python host/bench_suite.py --check               # vs host/bench_baseline.json
+    python host/bench_suite.py --save-baseline       # after an intended change
+
+--check exits 1 when a metric is more than --tolerance worse than the
+baseline (higher for virtual_us/lines, lower for main_loop).
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time as _wall
+
+import sim
+import simhw
+
+BASELINE = os.path.join(sim.HOST_DIR, "bench_baseline.json")
+CONFIG = "SIX"
+CALLS = 200
+TRACE_CALLS = 20
+MOTIONS = ("FW", "BW", "L", "R", "CCW", "CW", "FL", "FR", "BL", "BR")
+LOWER_IS_BETTER = ("virtual_us", "lines")
+HIGHER_IS_BETTER = ("iterations_per_s",)
+
+
+# Each setup gets a fresh, running library and returns (fn(i), calls,
+# us of intended sleep per call to subtract)
+def _motion(name):
+    def setup(ml):
+        f = getattr(ml, name)
+        return (lambda i: f(40 if i & 1 else 60)), CALLS, 0
+    return setup
+
+
+def _drive(ml):
+    return (lambda i: ml.drive(50, 20 if i & 1 else -20, 10)), CALLS, 0
+
+
+def _check_stop(ml):
+    return (lambda i: ml.check_stop()), CALLS, 0
+
+
+def _movement(ml):
+    return (lambda i: ml.movement("FW", 40 if i & 1 else 60, 0.05)), 20, 50000
+
+
+def _wait(ml):
+    return (lambda i: ml.wait(0.01)), 50, 10000
+
+
+def _oled_status(ml):
+    ml.oled_rate(0)         # draw inline so the draw is part of the call
+    return (lambda i: ml.oled_status("Speed", str(i), "", "")), CALLS, 0
+
+
+def _sensor(name):
+    def setup(ml):
+        f = getattr(ml, name)
+        return (lambda i: f()), CALLS, 0
+    return setup
+
+
+def _set_motor_config(config_id):
+    def setup(ml):
+        return (lambda i: ml.set_motor_config(config_id)), 5, 0
+    return setup
+
+
+def benchmarks(ml):
+    """(name, setup) for every benchmark; ml supplies the config IDs."""
+    b = [(name, _motion(name)) for name in MOTIONS]
+    b += [("drive", _drive), ("check_stop", _check_stop),
+          ("movement", _movement), ("wait", _wait),
+          ("oled_status", _oled_status)]
+    b += [(name, _sensor(name)) for name in
+          ("sensor_1", "sensor_2", "sensor_3", "read_sensors")]
+    b += [("set_motor_config[%s]" % cid, _set_motor_config(cid))
+          for cid in ml.CONFIG_IDS]
+    return b
+
+
+def _lines(source, fn, calls):
+    n = [0]
+
+    def tracer(frame, event, arg):
+        if frame.f_code.co_filename != source:
+            return None
+        if event == "line":
+            n[0] += 1
+        return tracer
+
+    sys.settrace(tracer)
+    try:
+        for i in range(calls):
+            fn(i)
+    finally:
+        sys.settrace(None)
+    return n[0] / calls
+
+
+def measure(config, setup):
+    ml = sim.load_library(config)
+    ml._resume()
+    fn, calls, sleep_us = setup(ml)
+    fn(0)                   # lazy init and first writes out of the way
+    fn(1)
+    t0 = simhw.clock.now_us
+    w0 = _wall.perf_counter()
+    for i in range(calls):
+        fn(i)
+    host_us = (_wall.perf_counter() - w0) * 1e6 / calls
+    virtual_us = (simhw.clock.now_us - t0) / calls - sleep_us
+    lines = _lines(ml.__file__, fn, min(calls, TRACE_CALLS))
+    return {"virtual_us": round(virtual_us, 1), "lines": round(lines, 1),
+            "host_us": round(host_us, 1)}
+
+
+def main_loop(config, seconds=5.0):
+    """main.py iterations per virtual second with START held."""
+    ml = sim.load_library(config)
+    n = 0
+    sensor_3 = ml.sensor_3
+
+    def counted():
+        nonlocal n
+        n += 1              # once per main.py loop iteration
+        return sensor_3()
+
+    ml.sensor_3 = counted   # main.py's star import picks this up
+    sim.set_sensor(3, 3000)
+    sim.press(sim.START_PIN, at=0.0, hold=seconds + 1)
+    w0 = _wall.perf_counter()
+    sim.run_main(seconds)
+    wall = _wall.perf_counter() - w0
+    return {"iterations_per_s": round(n / seconds, 1),
+            "host_us": round(wall * 1e6 / max(n, 1), 1)}
+
+
+def run(config=CONFIG, only=None):
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, setup in benchmarks(sim.load_library(config)):
+            if only and not any(o in name for o in only):
+                continue
+            results[name] = measure(config, setup)
+        if not only or any(o in "main_loop" for o in only):
+            results["main_loop"] = main_loop(config)
+    return {"config": config, "results": results}
+
+
+def compare(current, baseline, tolerance):
+    """Regressions beyond tolerance as readable strings."""
+    problems = []
+    for name, base in baseline["results"].items():
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+        for metric, b in base.items():
+            c = cur.get(metric)
+            if c is None:
+                continue
+            if metric in LOWER_IS_BETTER and c > b * (1 + tolerance) + 0.5:
+                problems.append("%s %s: %s -> %s (+%.0f%%)"
+                                % (name, metric, b, c, (c / b - 1) * 100 if b else 100))
+            elif metric in HIGHER_IS_BETTER and c < b * (1 - tolerance):
+                problems.append("%s %s: %s -> %s (%.0f%%)"
+                                % (name, metric, b, c, (c / b - 1) * 100))
+    return problems
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--config", default=CONFIG)
+    ap.add_argument("--only", nargs="*", help="benchmarks whose name contains any of these")
+    ap.add_argument("-o", "--output", help="write results as JSON")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--check", action="store_true",
+                    help="exit 1 on a regression against the baseline")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.10)
+    args = ap.parse_args(argv)
+
+    current = run(args.config, args.only)
+    print("%-30s %12s %10s %10s" % ("benchmark", "virtual_us", "lines", "host_us"))
+    for name, r in current["results"].items():
+        if "iterations_per_s" in r:
+            print("%-30s %12s %10s %10.1f   %.1f iterations/s"
+                  % (name, "", "", r["host_us"], r["iterations_per_s"]))
+        else:
+            print("%-30s %12.1f %10.1f %10.1f"
+                  % (name, r["virtual_us"], r["lines"], r["host_us"]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=1)
+            f.write("\n")
+        print("baseline saved to", args.baseline)
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["config"] != current["config"]:
+            sys.exit("baseline is for config %s" % baseline["config"])
+        problems = compare(current, baseline, args.tolerance)
+        if problems:
+            print("\n".join(problems))
+            sys.exit("%d regressions beyond %.0f%%" % (len(problems), args.tolerance * 100))
+        print("no regressions beyond %.0f%%" % (args.tolerance * 100))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Timing error of wait() and movement() on the simulated clock.
+
+Each duration is run --reps times from a random sub-millisecond phase.
+The error is actual virtual elapsed time minus the requested duration.
+--overhead-us is added to every pin read, i.e. to each check_stop() poll,
+to stand in for the loop body cost on a real board. "legacy" is the fixed
+`elapsed += 0.05` loop that wait() and movement() used before the
+deadline-based version.
+
+    python host/bench_timing.py [--reps 50] [--overhead-us 200]
+"""
+
+import random
+
+import sim
+import simhw
+
+DURATIONS = (0.001, 0.005, 0.02, 0.05, 0.12, 0.5, 2.0)
+
+
+def legacy_wait(ml, duration):
+    interval = 0.05
+    elapsed = 0
+    while elapsed < duration:
+        ml.check_stop()
+        if not ml._running:
+            ml.stop_all()
+            return
+        ml.time.sleep(interval)
+        elapsed += interval
+
+
+def run(ml, fn, duration, reps, rng):
+    errors = []
+    for _ in range(reps):
+        simhw.clock.advance(rng.randint(0, 999))
+        t0 = simhw.clock.now_us
+        fn(duration)
+        errors.append((simhw.clock.now_us - t0) / 1000 - duration * 1000)
+    return errors
+
+
+def _fmt(errors):
+    mean = sum(errors) / len(errors)
+    return "%+8.3f %8.3f %7.3f" % (mean, max(abs(e) for e in errors),
+                                   max(errors) - min(errors))
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--reps", type=int, default=50)
+    ap.add_argument("--config", default="SIX")
+    ap.add_argument("--overhead-us", type=int, default=200)
+    args = ap.parse_args(argv)
+    rng = random.Random(1)
+    simhw.COST_US["pin_read"] += args.overhead_us
+
+    ml = sim.load_library(args.config)
+    ml._running = True
+
+    def movement(duration):
+        ml.movement("FW", 100, duration)
+
+    cases = (
+        ("legacy", lambda d: legacy_wait(ml, d)),
+        ("wait", ml.wait),
+        ("movement", movement),
+    )
+    print("error vs requested duration, ms: mean / max |err| / jitter (p-p)")
+    print("%8s  " % "dur (s)" + "  ".join("%-25s" % c[0] for c in cases))
+    for d in DURATIONS:
+        cols = [_fmt(run(ml, fn, d, args.reps, rng)) for _, fn in cases]
+        print("%8.3f  " % d + "  ".join(cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Check host/motor_configs.py and regenerate the packed table in motor_library.py.
+
+Each config becomes 10 bytes (pwm, dir for every motor in MOTOR_NAMES,
+0xFF = not connected) in one bytes constant, so the board decodes only the
+config it uses instead of building every dict at import. The build fails
+on a pin used twice in one config, a pin the library already uses for
+something else, or a GPIO that cannot drive an output.
+
+    python host/build_configs.py           # check and rewrite the table
+    python host/build_configs.py --check   # check only; exit 1 if stale
+"""
+
+import os
+import sys
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+LIBRARY = os.path.join(os.path.dirname(HOST_DIR), "motor_library.py")
+
+BEGIN = "# <generated by host/build_configs.py>"
+END = "# </generated>"
+
+NC = 0xFF
+
+# Pins motor_library claims for other hardware
+RESERVED = {
+    0: "STOP button", 2: "warning LED", 15: "buzzer", 21: "OLED SDA",
+    22: "OLED SCL", 26: "servo4", 27: "servo3", 32: "servo2", 33: "servo1",
+    34: "START button", 35: "sensor_3", 36: "sensor_2", 39: "sensor_1",
+}
+# ESP32 GPIOs that cannot be outputs (34-39) or run the SPI flash (6-11)
+NOT_OUTPUT = set(range(6, 12)) | set(range(34, 40))
+
+
+def check(configs, names):
+    errors = []
+    for cid, cfg in configs.items():
+        if list(cfg) != list(names):
+            errors.append("%s: motors must be %s, got %s"
+                          % (cid, ", ".join(names), ", ".join(cfg)))
+            continue
+        used = {}
+        for name in names:
+            for role in ("pwm", "dir"):
+                pin = cfg[name][role]
+                if pin is None:
+                    if role == "pwm":
+                        errors.append("%s: %s has no pwm pin" % (cid, name))
+                    continue
+                who = "%s %s" % (name, role)
+                if pin in used:
+                    errors.append("%s: pin %d is both %s and %s"
+                                  % (cid, pin, used[pin], who))
+                elif pin in RESERVED:
+                    errors.append("%s: pin %d (%s) is the %s"
+                                  % (cid, pin, who, RESERVED[pin]))
+                elif pin in NOT_OUTPUT or not 0 <= pin < 40:
+                    errors.append("%s: pin %d (%s) cannot be an output"
+                                  % (cid, pin, who))
+                used[pin] = who
+    return errors
+
+
+def _hex(pins):
+    return "".join("\\x%02x" % p for p in pins)
+
+
+def _wrap(prefix, items, indent):
+    lines = []
+    line = prefix
+    for item in items:
+        if len(line) + len(item) + 2 > 76:
+            lines.append(line.rstrip())
+            line = indent
+        line += item + ", "
+    lines.append(line.rstrip(", ") + ")")
+    return lines
+
+
+def generate(configs, names):
+    ids = list(configs)
+    out = [BEGIN]
+    out += _wrap("MOTOR_NAMES = (", ['"%s"' % n for n in names], "               ")
+    out += _wrap("CONFIG_IDS = (", ['"%s"' % c for c in ids], "              ")
+    out.append("_CONFIG_PINS = (")
+    every = set()
+    for cid in ids:
+        pins = []
+        for name in names:
+            for role in ("pwm", "dir"):
+                p = configs[cid][name][role]
+                pins.append(NC if p is None else p)
+                if p is not None:
+                    every.add(p)
+        out.append('    b"%s"  # %s' % (_hex(pins), cid))
+    out.append(")")
+    out.append('_ALL_MOTOR_PINS = b"%s"' % _hex(sorted(every)))
+    out.append(END)
+    return out
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--check", action="store_true",
+                    help="only check; exit 1 if motor_library.py is out of date")
+    args = ap.parse_args(argv)
+
+    sys.path.insert(0, HOST_DIR)
+    import motor_configs as src
+
+    errors = check(src.motor_configs, src.MOTOR_NAMES)
+    if errors:
+        print("\n".join(errors))
+        sys.exit("motor config check failed")
+
+    with open(LIBRARY, newline="") as f:
+        text = f.read()
+    nl = "\r\n" if "\r\n" in text else "\n"
+    lines = text.split(nl)
+    a = lines.index(BEGIN)
+    b = lines.index(END)
+    new = lines[:a] + generate(src.motor_configs, src.MOTOR_NAMES) + lines[b + 1:]
+    if new == lines:
+        print("%d configs OK, table up to date" % len(src.motor_configs))
+        return
+    if args.check:
+        sys.exit("motor_library.py config table is out of date")
+    with open(LIBRARY, "w", newline="") as f:
+        f.write(nl.join(new))
+    print("%d configs OK, table rewritten" % len(src.motor_configs))
+
+
+if __name__ == "__main__":
+    main()
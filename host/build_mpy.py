@@ -0,0 +1,76 @@
+"""Cross-compile the board modules to .mpy bytecode.
+
+A .mpy skips parsing and compiling on the ESP32, which is most of the
+time `import motor_library` takes from a .py, and the compiler's RAM use.
+main.py is left as source: the board only runs main.py/boot.py as .py.
+Copy the .mpy files over the matching .py files (delete the .py, or it
+is imported instead).
+
+    python host/build_mpy.py                 # -> build/*.mpy
+    python host/build_mpy.py --wireless      # wireless library as motor_library.mpy
+    mpremote cp build/*.mpy :
+
+Needs mpy-cross on PATH or `pip install mpy-cross`, at a version that
+matches the firmware's .mpy format (mpy-cross --version).
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(HOST_DIR)
+
+MODULES = ("motor_library.py", "line_follower.py", "motor_async.py",
+           "motor_threads.py", "telemetry.py")
+WIRELESS = "motor_library.py (wireless)"
+
+
+def _mpy_cross():
+    exe = shutil.which("mpy-cross")
+    if exe:
+        return [exe]
+    try:
+        import mpy_cross  # noqa: F401
+    except ImportError:
+        sys.exit("mpy-cross not found: pip install mpy-cross")
+    return [sys.executable, "-m", "mpy_cross"]
+
+
+def build(out_dir, march="xtensawin", wireless=False, opt=0):
+    cmd = _mpy_cross()
+    os.makedirs(out_dir, exist_ok=True)
+    built = []
+    for name in MODULES:
+        src = os.path.join(REPO_DIR, name)
+        if wireless and name == "motor_library.py":
+            src = os.path.join(REPO_DIR, WIRELESS)
+        dst = os.path.join(out_dir, name[:-3] + ".mpy")
+        args = cmd + ["-o", dst, "-s", name, "-O%d" % opt]
+        if march:
+            args.append("-march=" + march)
+        subprocess.run(args + [src], check=True)
+        built.append((name, os.path.getsize(src), os.path.getsize(dst)))
+    return built
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("-o", "--out", default=os.path.join(REPO_DIR, "build"))
+    ap.add_argument("--march", default="xtensawin",
+                    help="native code arch, xtensawin = ESP32 ('' for none)")
+    ap.add_argument("--wireless", action="store_true",
+                    help="build the wireless library as motor_library.mpy")
+    ap.add_argument("-O", "--opt", type=int, default=0,
+                    help="mpy-cross optimisation level (1+ drops asserts)")
+    args = ap.parse_args(argv)
+
+    for name, src, dst in build(args.out, args.march, args.wireless, args.opt):
+        print("%-20s %7d -> %6d bytes" % (name, src, dst))
+
+
+if __name__ == "__main__":
+    main()
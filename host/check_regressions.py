@@ -0,0 +1,148 @@
+"""Regression checks for bugs fixed in the library, run on the simulator.
+
+Each check reproduces a bug that was fixed once and asserts it stays fixed:
+
+  pattern_race     stop_pattern() while _pattern_tick() retires a pattern
+  remote_loopback  RemoteClient against the wireless library's UDP server:
+                   applied, stale and rejected commands
+  telemetry        records streamed by telemetry.py decode back to the
+                   motor state they were taken from
+  oled_mirror      every OLED draw leaves the panel's GRAM equal to the
+                   framebuffer
+
+    python host/check_regressions.py [--only NAME ...]
+
+Prints ok/FAIL per check and exits 1 if any fails.
+"""
+
+import contextlib
+import io
+import sys
+import traceback
+
+import sim
+import simhw
+
+
+def pattern_race():
+    # The LED pattern ends at 20 ms; stop everything around that moment
+    # so the timer tick lands inside stop_pattern()
+    for off in range(19900, 20100, 5):
+        ml = sim.load_library("SIX")
+        ml.play_pattern(ml.led_warning, (10, 10), 1)
+        ml.play_pattern(ml.buzzer_pin, (50, 50), 0)
+        simhw.clock.advance(off)
+        ml.stop_pattern()
+        assert not ml._patterns, "patterns left at %d us" % off
+        assert ml.led_warning.value() == 0 and ml.buzzer_pin.value() == 0, \
+            "pin left on at %d us" % off
+    ml = sim.load_library("SIX")
+    try:
+        ml.play_pattern(ml.led_warning, (100, 100, 300), 2)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("odd-length pattern accepted")
+
+
+def remote_loopback():
+    from remote_client import RemoteClient, MOTION, PING
+
+    ml = sim.load_wireless("SIX")
+    ml._running = True      # as after wait_for_start()
+    ml.remote_start(0)
+    c = RemoteClient("127.0.0.1", ml._remote_sock.getsockname()[1], timeout=1.0)
+    try:
+        def send(cmd, a=0, seq=None):
+            if seq is not None:
+                c.seq = (seq - 1) & 0xFFFF
+            c.send(cmd, a, speed=60, wait=False)
+            ml.remote_poll()
+            return c._reply(c.seq, 0)
+
+        assert send(MOTION, 0) == 0, "FW not applied"
+        assert ml._remote_driving, "FW applied but not driving"
+        seq, last_ms = ml._remote_seq, ml._remote_last_ms
+        simhw.clock.advance(5000)
+        assert send(9) == 2, "unknown command not rejected"
+        assert send(MOTION, 10) == 2, "bad MOTION index not rejected"
+        assert (ml._remote_seq, ml._remote_last_ms) == (seq, last_ms), \
+            "rejected packet moved seq or the dead-man timer"
+        assert send(PING, seq=seq) == 1, "repeated seq not stale"
+        assert send(PING, seq=seq + 1) == 0, "next seq not applied"
+        assert (c.stale, c.rejected, c.lost) == (1, 2, 0), c.summary()
+    finally:
+        c.close()
+        ml.remote_stop()
+
+
+def telemetry():
+    from telemetry_decode import Decoder
+
+    ml = sim.load_library("SIX")
+    ml._resume()
+    import telemetry as tm
+    out = io.BytesIO()
+    tm.start(stream=out, rate_hz=50, send_hz=5)
+    try:
+        ml.FW(60)
+        ml.wait(0.5)
+        duty = ml.motors["front_left"]["last_duty"]
+    finally:
+        tm.stop()
+    d = Decoder()
+    d.stream(out.getvalue())
+    assert not d.bad and not d.lost_frames, "bad %d lost %d" % (d.bad, d.lost_frames)
+    assert 20 <= len(d.rows) <= 27, "%d records for 0.5 s at 50 Hz" % len(d.rows)
+    row = dict(zip(("src", "frame", "t_ms", "duty_front_left"), d.rows[-1]))
+    assert row["duty_front_left"] == duty, \
+        "duty %s decoded, %s on the motor" % (row["duty_front_left"], duty)
+    t = [r[2] for r in d.rows]
+    assert t == sorted(t), "timestamps out of order"
+
+
+def oled_mirror():
+    ml = sim.load_library("SIX")
+    ml.oled_rate(0)
+    draws = (("status", lambda: ml.oled_status("Speed", "60", "FW", "")),
+             ("mode", lambda: ml.oled_mode("LINE")),
+             ("clear", ml.oled_clear))
+    for name, draw in draws:
+        draw()
+        o = ml.get_oled()
+        assert bytes(o.gram) == bytes(o.buffer), "GRAM differs after " + name
+
+
+CHECKS = (("pattern_race", pattern_race),
+          ("remote_loopback", remote_loopback),
+          ("telemetry", telemetry),
+          ("oled_mirror", oled_mirror))
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--only", nargs="*", help="checks whose name contains any of these")
+    args = ap.parse_args(argv)
+
+    failed = 0
+    for name, check in CHECKS:
+        if args.only and not any(o in name for o in args.only):
+            continue
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                check()
+        except Exception as e:
+            failed += 1
+            print("%-16s FAIL  %s" % (name, e or type(e).__name__))
+            if not isinstance(e, AssertionError):
+                traceback.print_exc()
+        else:
+            print("%-16s ok" % name)
+    if failed:
+        sys.exit("%d checks failed" % failed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Minimal host stand-in for MicroPython's `framebuf` (MONO_VLSB only).
+#
+# text() draws a deterministic pseudo-glyph per character rather than the
+# real 8x8 font: enough for pixel diffs and byte counts, not for reading.
+
+MONO_VLSB = 0
+
+
+def _glyph(ch):
+    if ch == " ":
+        return b"\x00" * 8
+    c = ord(ch)
+    return bytes(((c * (j + 3) * 37) & 0x7E) | 0x01 for j in range(8))
+
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, format=MONO_VLSB, stride=None):
+        self._buf = buf
+        self._w = width
+        self._h = height
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._w and 0 <= y < self._h):
+            return None if c is None else None
+        idx = (y >> 3) * self._w + x
+        bit = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buf[idx] & bit else 0
+        if c:
+            self._buf[idx] |= bit
+        else:
+            self._buf[idx] &= ~bit & 0xFF
+
+    def fill(self, c):
+        v = 0xFF if c else 0x00
+        for i in range(len(self._buf)):
+            self._buf[i] = v
+
+    def fill_rect(self, x, y, w, h, c):
+        for yy in range(max(0, y), min(self._h, y + h)):
+            for xx in range(max(0, x), min(self._w, x + w)):
+                self.pixel(xx, yy, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def text(self, s, x, y, c=1):
+        for ch in s:
+            g = _glyph(ch)
+            for j in range(8):
+                col = g[j]
+                for k in range(8):
+                    if col & (1 << k):
+                        self.pixel(x + j, y + k, c)
+            x += 8
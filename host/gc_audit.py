@@ -0,0 +1,239 @@
+"""Check that motor_library's hot paths run without heap allocation.
+
+On the board (wheels off the ground, the motors run):
+
+    mpremote run host/gc_audit.py
+
+calls each hot path CALLS times with the GC disabled and prints the
+gc.mem_alloc() growth per call, then how long gc.collect() takes to clear
+it. On the host CPython's allocator says nothing about MicroPython's, so
+the audit runs each path on the simulated board, records the library
+lines it executes and flags the ones with constructs that allocate on
+MicroPython: list/dict/set/tuple building, dict views, slices, string
+building, float arithmetic, closures, print and raise.
+
+    python host/gc_audit.py [--config SIX] [--check]
+
+--check exits 1 if any hot path allocates.
+"""
+
+import sys
+import time
+
+CONFIG = "SIX"
+CALLS = 100
+MOTIONS = ("FW", "BW", "L", "R", "CCW", "CW", "FL", "FR", "BL", "BR")
+
+
+def hot_paths(ml):
+    # (name, function, args); the library must be configured and running
+    paths = [("check_stop", ml.check_stop, ())]
+    for name in MOTIONS:
+        paths.append((name, getattr(ml, name), (60,)))
+    paths += [
+        ("drive", ml.drive, (50, -20, 10)),
+        ("run", ml.run, ("front_left", 60)),
+        ("stop_drive", ml.stop_drive, ()),
+        ("stop_all", ml.stop_all, ()),
+        ("sensor_1", ml.sensor_1, ()),
+        ("sensor_2", ml.sensor_2, ()),
+        ("sensor_3", ml.sensor_3, ()),
+        ("read_sensors", ml.read_sensors, ()),
+        ("wait", ml.wait, (0.002,)),
+        ("movement", ml.movement, ("FW", 60, 0.002)),
+        ("_ramp_tick", ml._ramp_tick, (None,)),
+        ("_sample_tick", ml._sample_tick, (None,)),
+    ]
+    return paths
+
+
+def _call(fn, args):
+    # No fn(*args): that allocates on MicroPython
+    n = len(args)
+    if n == 0:
+        fn()
+    elif n == 1:
+        fn(args[0])
+    elif n == 2:
+        fn(args[0], args[1])
+    else:
+        fn(args[0], args[1], args[2])
+
+
+def _setup(ml, name):
+    # Paths that only run with something else active
+    if name == "_ramp_tick":
+        ml.set_ramp(2000, 4000)
+        ml.FW(60)
+    elif name == "_sample_tick":
+        ml.set_ramp(0, 0)
+        ml.start_sampler(500, 64, timer=False)
+
+
+# ---------------- Board ----------------
+def board():
+    import gc
+    import motor_library as ml
+    ml.set_motor_config(CONFIG)
+    ml._resume()
+    print("%-14s %12s %14s" % ("path", "bytes/call", "collect (us)"))
+    for name, fn, args in hot_paths(ml):
+        _setup(ml, name)
+        _call(fn, args)         # first call may init lazily
+        gc.collect()
+        gc.disable()
+        a = gc.mem_alloc()
+        for _ in range(CALLS):
+            _call(fn, args)
+        used = gc.mem_alloc() - a
+        t0 = time.ticks_us()
+        gc.collect()
+        pause = time.ticks_diff(time.ticks_us(), t0)
+        gc.enable()
+        print("%-14s %12d %14d" % (name, used // CALLS, pause))
+    ml.stop_sampler()
+    ml.stop_all()
+
+
+# ---------------- Host ----------------
+def _allocating_lines(path):
+    """{lineno: [reason, ...]} for constructs that allocate on MicroPython."""
+    import ast
+
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    found = {}
+    operands = {}       # lineno -> names used in arithmetic, checked for floats
+
+    def add(node, why):
+        found.setdefault(node.lineno, [])
+        if why not in found[node.lineno]:
+            found[node.lineno].append(why)
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.List, ast.Dict, ast.Set)) and \
+                not isinstance(getattr(node, "ctx", None), ast.Store):
+            add(node, type(node).__name__.lower())
+        elif isinstance(node, (ast.ListComp, ast.DictComp, ast.SetComp,
+                               ast.GeneratorExp)):
+            add(node, "comprehension")
+        elif isinstance(node, ast.Tuple) and isinstance(node.ctx, ast.Load) \
+                and not all(isinstance(e, ast.Constant) for e in node.elts):
+            add(node, "tuple")
+        elif isinstance(node, (ast.Lambda, ast.JoinedStr)):
+            add(node, "lambda" if isinstance(node, ast.Lambda) else "f-string")
+        elif isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Slice) \
+                and isinstance(node.ctx, ast.Load):
+            add(node, "slice")
+        elif isinstance(node, ast.Raise):
+            add(node, "raise")
+        elif isinstance(node, ast.Starred) or (isinstance(node, ast.keyword)
+                                               and node.arg is None):
+            add(node, "*args")
+        elif isinstance(node, ast.Call):
+            f = node.func
+            if isinstance(f, ast.Attribute) and f.attr in ("values", "items", "keys"):
+                add(node, "dict view")
+            elif isinstance(f, ast.Attribute) and f.attr in ("append", "extend", "insert"):
+                add(node, "list growth")
+            elif isinstance(f, ast.Name) and f.id in (
+                    "list", "dict", "set", "tuple", "sorted", "str", "repr",
+                    "float", "bytes", "bytearray", "enumerate", "zip", "map",
+                    "filter", "print"):
+                add(node, f.id + "()")
+        elif isinstance(node, ast.BinOp):
+            if isinstance(node.op, ast.Div):
+                add(node, "float division")
+            for side in (node.left, node.right):
+                if isinstance(side, ast.Constant) and isinstance(side.value, float):
+                    add(node, "float arithmetic")
+                elif isinstance(side, ast.Constant) and isinstance(side.value, str):
+                    add(node, "string building")
+                elif isinstance(side, ast.Name):
+                    operands.setdefault(node.lineno, set()).add(side.id)
+        elif isinstance(node, ast.FunctionDef):
+            for inner in ast.walk(node):
+                if inner is not node and isinstance(inner, ast.FunctionDef):
+                    add(inner, "closure")
+    return found, operands
+
+
+def audit(config=CONFIG):
+    """Run every hot path on the simulator; {path: [(lineno, reasons)]}."""
+    import os
+
+    host = os.path.dirname(os.path.abspath(__file__))
+    if host not in sys.path:
+        sys.path.insert(0, host)
+    import sim
+
+    ml = sim.load_library(config)
+    ml._resume()
+    source = ml.__file__
+    found, operands = _allocating_lines(source)
+    hits = set()
+
+    def tracer(frame, event, arg):
+        if frame.f_code.co_filename != source:
+            return None
+        if event == "line":
+            n = frame.f_lineno
+            if n in found:
+                hits.add((n, None))
+            for name in operands.get(n, ()):
+                if type(frame.f_locals.get(name)) is float:
+                    hits.add((n, "float arithmetic"))
+        return tracer
+
+    report = {}
+    for name, fn, args in hot_paths(ml):
+        _setup(ml, name)
+        _call(fn, args)
+        hits.clear()
+        sys.settrace(tracer)
+        try:
+            _call(fn, args)
+        finally:
+            sys.settrace(None)
+        lines = {}
+        for n, why in hits:
+            lines.setdefault(n, [])
+            for w in ([why] if why else found[n]):
+                if w not in lines[n]:
+                    lines[n].append(w)
+        report[name] = sorted(lines.items())
+    ml.stop_sampler()
+    return report, source
+
+
+def main(argv=None):
+    import argparse
+    import contextlib
+    import io
+    import os
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--config", default=CONFIG)
+    ap.add_argument("--check", action="store_true",
+                    help="exit 1 if any hot path allocates")
+    args = ap.parse_args(argv)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        report, source = audit(args.config)
+    bad = 0
+    for name, lines in report.items():
+        if not lines:
+            print("%-14s ok" % name)
+            continue
+        bad += 1
+        print("%-14s allocates" % name)
+        for n, reasons in lines:
+            print("    %s:%d  %s" % (os.path.basename(source), n, ", ".join(reasons)))
+    if bad and args.check:
+        sys.exit("%d hot paths allocate" % bad)
+
+
+if sys.implementation.name == "micropython":
+    board()
+elif __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# Host-side stand-in for MicroPython's `machine` module (ESP32 subset).
+#
+# Pin, PWM and ADC state lives in per-GPIO registries, so two Pin(5) objects
+# see the same level just like on the board. Inputs are driven from the
+# harness with drive(); ADC readings come from set_adc().
+
+import simhw
+
+_pin_level = {}        # gpio -> level last written (outputs)
+_pin_input = {}        # gpio -> level driven from outside (inputs)
+_pin_mode = {}         # gpio -> Pin.IN / Pin.OUT
+_pin_pull = {}         # gpio -> Pin.PULL_UP / Pin.PULL_DOWN / None
+_pwm_duty = {}         # gpio -> current duty, None once deinit()
+_pwm_freq = {}         # gpio -> frequency
+_adc_source = {}       # gpio -> int or callable(t_us) -> int
+_pin_irq = {}          # gpio -> (handler, trigger, Pin)
+
+i2c_bytes = 0          # total bytes moved over every I2C bus
+
+
+def reset_state():
+    """Forget every pin, PWM and ADC setting (used between sim runs)."""
+    global i2c_bytes
+    for reg in (_pin_level, _pin_input, _pin_mode, _pin_pull,
+                _pwm_duty, _pwm_freq, _adc_source, _pin_irq):
+        reg.clear()
+    i2c_bytes = 0
+
+
+def _level(gpio):
+    if gpio in _pin_input:
+        return _pin_input[gpio]
+    if _pin_mode.get(gpio) == Pin.OUT:
+        return _pin_level.get(gpio, 0)
+    return 1 if _pin_pull.get(gpio) == Pin.PULL_UP else 0
+
+
+def _edge(gpio, before):
+    after = _level(gpio)
+    irq = _pin_irq.get(gpio)
+    if irq is None or after == before:
+        return
+    handler, trigger, pin, hard = irq
+    if (after and trigger & Pin.IRQ_RISING) or \
+            (not after and trigger & Pin.IRQ_FALLING):
+        if hard:
+            simhw.cost("irq_entry")
+            handler(pin)
+            return
+
+        def soft():
+            simhw.cost("irq_entry")
+            handler(pin)
+        simhw.schedule(soft)
+
+
+def drive(gpio, level):
+    """Drive an input pin from outside, e.g. a button press."""
+    before = _level(gpio)
+    _pin_input[gpio] = 1 if level else 0
+    simhw.record("input", gpio, _pin_input[gpio])
+    _edge(gpio, before)
+
+
+def release(gpio):
+    """Stop driving an input; it falls back to its pull resistor."""
+    before = _level(gpio)
+    _pin_input.pop(gpio, None)
+    simhw.record("input", gpio, None)
+    _edge(gpio, before)
+
+
+def set_adc(gpio, source):
+    """Set the raw 12-bit reading for an ADC pin (int or fn(t_us) -> int)."""
+    _adc_source[gpio] = source
+
+
+def pin_level(gpio):
+    return _pin_level.get(gpio, 0)
+
+
+def pwm_duty(gpio):
+    return _pwm_duty.get(gpio)
+
+
+def reset():
+    raise simhw.SimReset()
+
+
+def soft_reset():
+    raise simhw.SimReset()
+
+
+def freq(hz=None):
+    return 240000000
+
+
+def disable_irq():
+    # Timer events due meanwhile run at enable_irq(), like pending IRQs
+    state = simhw.clock.irq_off
+    simhw.clock.irq_off = True
+    return state
+
+
+def enable_irq(state=False):
+    simhw.clock.irq_off = state
+    if not state:
+        with simhw.clock._cond:
+            simhw.clock._run_until(simhw.clock.now_us)
+
+
+def _gpio(pin):
+    return pin.id if isinstance(pin, Pin) else pin
+
+
+# ---------------- Pin ----------------
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 2
+    PULL_DOWN = 1
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        simhw.cost("pin_init")
+        if mode != -1:
+            _pin_mode[id] = mode
+        if pull != -1:
+            _pin_pull[id] = pull
+        if value is not None:
+            self._write(value)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.__init__(self.id, mode, pull, value)
+
+    def _write(self, v):
+        v = 1 if v else 0
+        _pin_level[self.id] = v
+        simhw.record("pin", self.id, v)
+
+    def value(self, v=None):
+        if v is None:
+            simhw.cost("pin_read")
+            return _level(self.id)
+        simhw.cost("pin_write")
+        self._write(v)
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        """
+        Call handler(pin) on matching edges of drive()/release(). Like on
+        the board a soft (hard=False) handler waits for a blocking call or
+        a running scheduled callback to return, see simhw.schedule().
+        """
+        if handler is None:
+            _pin_irq.pop(self.id, None)
+        else:
+            _pin_irq[self.id] = (handler, trigger, self, hard)
+
+    def on(self):
+        self.value(1)
+
+    def off(self):
+        self.value(0)
+
+    def __call__(self, v=None):
+        return self.value(v)
+
+    def __repr__(self):
+        return "Pin(%d)" % self.id
+
+
+# ---------------- PWM ----------------
+class PWM:
+    def __init__(self, pin, freq=None, duty=None):
+        self.gpio = _gpio(pin)
+        simhw.cost("pwm_init")
+        if self.gpio not in _pwm_duty or _pwm_duty[self.gpio] is None:
+            _pwm_duty[self.gpio] = 0
+        if freq is not None:
+            _pwm_freq[self.gpio] = freq
+        if duty is not None:
+            self.duty(duty)
+
+    def freq(self, f=None):
+        if f is None:
+            return _pwm_freq.get(self.gpio, 5000)
+        simhw.cost("pwm_freq")
+        _pwm_freq[self.gpio] = f
+
+    def duty(self, d=None):
+        if d is None:
+            return _pwm_duty.get(self.gpio) or 0
+        simhw.cost("pwm_duty")
+        d = max(0, min(1023, int(d)))
+        _pwm_duty[self.gpio] = d
+        simhw.record("duty", self.gpio, d)
+
+    def duty_u16(self, d=None):
+        if d is None:
+            return (self.duty() * 65535) // 1023
+        self.duty((d * 1023) // 65535)
+
+    def deinit(self):
+        simhw.cost("pwm_deinit")
+        _pwm_duty[self.gpio] = None
+        simhw.record("duty", self.gpio, None)
+
+    def __repr__(self):
+        return "PWM(Pin(%d))" % self.gpio
+
+
+# ---------------- ADC ----------------
+class ADC:
+    ATTN_0DB = 0
+    ATTN_2_5DB = 1
+    ATTN_6DB = 2
+    ATTN_11DB = 3
+    WIDTH_9BIT = 0
+    WIDTH_10BIT = 1
+    WIDTH_11BIT = 2
+    WIDTH_12BIT = 3
+
+    def __init__(self, pin, atten=None):
+        self.gpio = _gpio(pin)
+        simhw.cost("adc_init")
+
+    def atten(self, a):
+        simhw.cost("adc_config")
+
+    def width(self, w):
+        simhw.cost("adc_config")
+
+    def read(self):
+        simhw.cost("adc_read")
+        src = _adc_source.get(self.gpio, 0)
+        if callable(src):
+            src = src(simhw.clock.now_us)
+        return max(0, min(4095, int(src)))
+
+    def read_u16(self):
+        return self.read() << 4
+
+
+# ---------------- Timer ----------------
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=0, **kwargs):
+        self.id = id
+        self._gen = 0
+        self._period_us = 0
+        self._mode = Timer.PERIODIC
+        self._callback = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None):
+        self.deinit()
+        if freq > 0:
+            self._period_us = 1000000 // freq
+        else:
+            self._period_us = max(1, period) * 1000
+        self._mode = mode
+        self._callback = callback
+        self._schedule()
+
+    def _schedule(self):
+        gen = self._gen
+
+        def fire():
+            if gen != self._gen:
+                return              # deinit() or init() since scheduled
+            if self._mode == Timer.PERIODIC:
+                self._schedule()
+            simhw.schedule(run)
+
+        def run():
+            simhw.cost("timer_entry")
+            if self._callback is not None:
+                self._callback(self)
+
+        simhw.clock.call_later(self._period_us, fire)
+
+    def deinit(self):
+        self._gen += 1
+
+
+# ---------------- I2C ----------------
+class I2C:
+    def __init__(self, id=0, scl=None, sda=None, freq=400000):
+        self.freq = freq
+
+    def _transfer(self, n):
+        global i2c_bytes
+        i2c_bytes += n
+        # start + address byte + n data bytes, 9 clocks per byte; blocks
+        # soft IRQs like the real driver
+        simhw.enter()
+        try:
+            simhw.clock.advance((n + 1) * 9 * 1000000 // self.freq)
+        finally:
+            simhw.leave()
+
+    def scan(self):
+        return [0x3C]
+
+    def writeto(self, addr, buf, stop=True):
+        self._transfer(len(buf))
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True):
+        n = 0
+        for buf in vector:
+            n += len(buf)
+        self._transfer(n)
+        return n
+
+    def readfrom(self, addr, n, stop=True):
+        self._transfer(n)
+        return bytes(n)
@@ -0,0 +1,21 @@
+# Host stand-in for the `micropython` module.
+
+
+def const(x):
+    return x
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def schedule(fn, arg):
+    fn(arg)
+
+
+def native(fn):
+    return fn
+
+
+def viper(fn):
+    return fn
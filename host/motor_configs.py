@@ -0,0 +1,223 @@
+# Source of the motor pin table in motor_library.py. The board never loads
+# this file: after editing, run `python host/build_configs.py` to check the
+# pins and regenerate the packed table. "dir": None = no direction pin.
+#
+# Motor order is MOTOR_NAMES; every config lists all five.
+
+MOTOR_NAMES = ("front_left", "front_right", "back_left", "back_right",
+               "extra_motor")
+
+motor_configs = {
+    "ONE": {       #rohit sir
+        "front_left": {"pwm": 4, "dir": 5},
+        "front_right": {"pwm": 13, "dir": 14},
+        "back_left": {"pwm": 18, "dir": 19},
+        "back_right": {"pwm": 17, "dir": 16},
+        "extra_motor": {"pwm": 25, "dir": 23},
+    },
+    "TWO": {       #rohit sir
+        "front_left": {"pwm": 18, "dir": 19},
+        "front_right": {"pwm": 23, "dir": 25},
+        "back_left": {"pwm": 16, "dir": 17},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "THREE": {
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "FOUR": {
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "FIVE": {
+        "front_left": {"pwm": 23, "dir": 25},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 16, "dir": 17},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "SIX": {    #OSHIWARA
+        "front_left": {"pwm": 23, "dir": 25},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 16, "dir": 17},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "SEVEN": {       #rohit sir
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "EIGHT": {     #KANDIVALI
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "NINE": {       #rohit sir
+        "front_left": {"pwm": 23, "dir": 25},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 16, "dir": 17},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "TEN": {       #rohit sir
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "ELEVEN": {     #JUHU
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "TWELVE": {        #SOBO MUMBAI
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "THIRTEEN": {      #SOBO MUMBAI
+        "front_left": {"pwm": 5, "dir": 4},
+        "front_right": {"pwm": 14, "dir": 13},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 19, "dir": 18},
+        "extra_motor": {"pwm": 25, "dir": 23},
+    },
+    "FOURTEEN": {     #SURAT
+        "front_left": {"pwm": 5, "dir": 4},
+        "front_right": {"pwm": 14, "dir": 13},
+        "back_left": {"pwm": 18, "dir": 19},
+        "back_right": {"pwm": 16, "dir": 17},
+        "extra_motor": {"pwm": 25, "dir": 23},
+    },
+    "FIFTEEN": {      #SURAT
+        "front_left": {"pwm": 19, "dir": 18},
+        "front_right": {"pwm": 17, "dir": 16},
+        "back_left": {"pwm": 13, "dir": 14},
+        "back_right": {"pwm": 4, "dir": 5},
+        # dir was 13, which is back_left's pwm; wiring to be confirmed
+        "extra_motor": {"pwm": 25, "dir": None},
+    },
+    "SIXTEEN": {      #SURAT
+        "front_left": {"pwm": 5, "dir": 4},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 23, "dir": 25},
+    },
+    "SEVENTEEN": {     #SURAT
+        "front_left": {"pwm": 18, "dir": 19},
+        "front_right": {"pwm": 23, "dir": 25},
+        "back_left": {"pwm": 13, "dir": 14},
+        "back_right": {"pwm": 17, "dir": 16},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "EIGHTEEN": {      #SURAT
+        "front_left": {"pwm": 14, "dir": 13},
+        "front_right": {"pwm": 5, "dir": 4},
+        "back_left": {"pwm": 18, "dir": 19},
+        "back_right": {"pwm": 16, "dir": 17},
+        "extra_motor": {"pwm": 23, "dir": 25},
+    },
+    "NINETEEN": {       #SURAT
+        "front_left": {"pwm": 18, "dir": 19},
+        "front_right": {"pwm": 23, "dir": 25},
+        "back_left": {"pwm": 13, "dir": 14},
+        "back_right": {"pwm": 16, "dir": 17},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "TWENTY": {      # Satellite Ahmedabad
+        "front_left": {"pwm": 18, "dir": 19},
+        "front_right": {"pwm": 16, "dir": 17},
+        "back_left": {"pwm": 13, "dir": 14},
+        "back_right": {"pwm": 4, "dir": 5},
+        "extra_motor": {"pwm": 23, "dir": 25},
+    },
+    "TWENTYONE": {      #SBR Ahmedabad
+        "front_left": {"pwm": 17, "dir": 16},
+        "front_right": {"pwm": 14, "dir": 13},
+        "back_left": {"pwm": 25, "dir": 23},
+        "back_right": {"pwm": 19, "dir": 18},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "TWENTYTWO": {      # Satellite Ahmedabad
+        "front_left": {"pwm": 18, "dir": 19},
+        "front_right": {"pwm": 17, "dir": 16},
+        "back_left": {"pwm": 13, "dir": 14},
+        "back_right": {"pwm": 25, "dir": 23},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+    "TWENTYTHREE": {   #South Bopal Ahmedabad
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "TWENTYFOUR": {     #Adani Ahmedabad
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 17, "dir": 16},
+        "back_left": {"pwm": 14, "dir": 13},
+        "back_right": {"pwm": 19, "dir": 18},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "TWENTYFIVE": {    #Adani Ahmedabad
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "TWENTYSIX": {    #Adani Ahmedabad
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "TWENTYSEVEN": {    #Adani Ahmedabad
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "TWENTYEIGHT": {     #South Bopal Ahmedabad
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "TWENTYNINE": {      #South Bopal Ahmedabad
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 19, "dir": 18},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 14, "dir": 13},
+        "extra_motor": {"pwm": 5, "dir": 4},
+    },
+    "THIRTY": {      #YET TO CONFIRM
+        "front_left": {"pwm": 25, "dir": 23},
+        "front_right": {"pwm": 18, "dir": 19},
+        "back_left": {"pwm": 17, "dir": 16},
+        "back_right": {"pwm": 13, "dir": 14},
+        "extra_motor": {"pwm": 4, "dir": 5},
+    },
+}
+
@@ -0,0 +1,138 @@
+"""Client for the UDP remote-drive server in the wireless motor_library.
+
+Packet layout and command codes match the "Remote Drive" section of
+`motor_library.py (wireless)`. Every send waits for the robot's 4-byte
+reply, so the round-trip time of each command is known.
+
+    python host/remote_client.py 192.168.4.1 --vector 60 0 0 --rate 50 --seconds 2
+    python host/remote_client.py 192.168.4.1 --motion CW --speed 70
+"""
+
+import socket
+import struct
+import time
+
+PORT = 4210
+MAGIC = 0xE7
+
+STOP = 0
+MOTION = 1
+VECTOR = 2
+PING = 3
+
+MOTIONS = ("FW", "BW", "L", "R", "CCW", "CW", "FL", "FR", "BL", "BR")
+
+_FMT = "<BBHbbbB"
+_ACK = "<BBH"
+
+
+def _clamp(v, lo=-100, hi=100):
+    return max(lo, min(hi, int(v)))
+
+
+class RemoteClient:
+    def __init__(self, host="192.168.4.1", port=PORT, timeout=0.2):
+        self.addr = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(timeout)
+        self.seq = 0
+        self.rtts = []          # seconds, one per applied command
+        self.stale = 0          # replies saying the robot dropped the packet
+        self.rejected = 0       # replies saying the command was invalid
+        self.lost = 0           # no reply within timeout
+
+    def close(self):
+        self.sock.close()
+
+    def packet(self, cmd, a=0, b=0, c=0, speed=0):
+        self.seq = (self.seq + 1) & 0xFFFF
+        return struct.pack(_FMT, MAGIC, cmd, self.seq, _clamp(a), _clamp(b),
+                           _clamp(c), _clamp(speed, 0, 100))
+
+    def send(self, cmd, a=0, b=0, c=0, speed=0, wait=True):
+        """Send one command; with wait, return its reply status (None if lost)."""
+        data = self.packet(cmd, a, b, c, speed)
+        t0 = time.perf_counter()
+        self.sock.sendto(data, self.addr)
+        if not wait:
+            return None
+        return self._reply(self.seq, t0)
+
+    def _reply(self, seq, t0):
+        while True:
+            try:
+                data = self.sock.recv(16)
+            except socket.timeout:
+                self.lost += 1
+                return None
+            if len(data) != 4:
+                continue
+            magic, status, got = struct.unpack(_ACK, data)
+            if magic != MAGIC or got != seq:
+                continue        # reply to an earlier packet
+            if status == 0:
+                self.rtts.append(time.perf_counter() - t0)
+            elif status == 1:
+                self.stale += 1
+            else:
+                self.rejected += 1
+            return status
+
+    def motion(self, name, speed=100, wait=True):
+        return self.send(MOTION, MOTIONS.index(name), speed=speed, wait=wait)
+
+    def vector(self, vx, vy=0, omega=0, wait=True):
+        return self.send(VECTOR, vx, vy, omega, wait=wait)
+
+    def ping(self, wait=True):
+        return self.send(PING, wait=wait)
+
+    def stop(self, wait=True):
+        return self.send(STOP, wait=wait)
+
+    def summary(self):
+        r = sorted(self.rtts)
+        if not r:
+            return "no replies (%d lost)" % self.lost
+        return ("%d applied, %d stale, %d rejected, %d lost; "
+                "rtt ms p50 %.2f p95 %.2f max %.2f"
+                % (len(r), self.stale, self.rejected, self.lost, r[len(r) // 2] * 1000,
+                   r[int(len(r) * 0.95)] * 1000, r[-1] * 1000))
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("host", nargs="?", default="192.168.4.1")
+    ap.add_argument("--port", type=int, default=PORT)
+    ap.add_argument("--motion", choices=MOTIONS)
+    ap.add_argument("--speed", type=int, default=60)
+    ap.add_argument("--vector", type=int, nargs=3, metavar=("VX", "VY", "OMEGA"))
+    ap.add_argument("--rate", type=float, default=50, help="packets per second")
+    ap.add_argument("--seconds", type=float, default=1.0)
+    args = ap.parse_args(argv)
+
+    client = RemoteClient(args.host, args.port)
+    period = 1 / args.rate
+    end = time.perf_counter() + args.seconds
+    try:
+        while time.perf_counter() < end:
+            t = time.perf_counter()
+            if args.vector:
+                client.vector(*args.vector)
+            elif args.motion:
+                client.motion(args.motion, args.speed)
+            else:
+                client.ping()
+            left = period - (time.perf_counter() - t)
+            if left > 0:
+                time.sleep(left)
+    finally:
+        client.stop()
+        print(client.summary())
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Run motor_library.py and main.py on desktop CPython.
+
+Puts the fake `machine`, `ssd1306`, `framebuf`, `micropython`, `uasyncio`
+and `_thread` modules from this folder in front of the real ones, sends
+`time` to the virtual clock in simhw and gives a few helpers for scripting
+buttons and sensors.
+
+    python host/sim.py --seconds 600 --start 1.0 --sensor3 3000
+
+runs a 10 minute main.py session and prints what the motors did.
+"""
+
+import os
+import sys
+import tempfile
+import time as _wall
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(HOST_DIR)
+
+for _p in (REPO_DIR, HOST_DIR):
+    if _p in sys.path:
+        sys.path.remove(_p)
+    sys.path.insert(0, _p)
+
+import simhw
+import simthread
+import machine
+
+# The board's filesystem: files the library saves (config ID, calibration)
+# go here instead of the current directory. Kept for the whole process.
+FLASH_DIR = tempfile.mkdtemp(prefix="erc-sim-flash-")
+
+START_PIN = 34
+STOP_PIN = 0
+SENSOR_PINS = (39, 36, 35)      # sensor_1, sensor_2, sensor_3
+
+
+def install():
+    """Reset all simulated hardware and route `time` to the virtual clock."""
+    os.chdir(FLASH_DIR)
+    simhw.patch_time()
+    sys.modules["_thread"] = simthread
+    simhw.reset()
+    machine.reset_state()
+    for mod in ("motor_library", "motor_async", "motor_threads",
+                "line_follower", "telemetry", "ssd1306", "framebuf"):
+        sys.modules.pop(mod, None)
+
+
+def load_library(config=None):
+    """Import a fresh motor_library, optionally selecting a motor config."""
+    install()
+    import motor_library
+    if config is not None:
+        motor_library.set_motor_config(config)
+    return motor_library
+
+
+def load_wireless(config=None):
+    """Import `motor_library.py (wireless)` as motor_library instead."""
+    import importlib.machinery
+    import importlib.util
+    install()
+    path = os.path.join(REPO_DIR, "motor_library.py (wireless)")
+    loader = importlib.machinery.SourceFileLoader("motor_library", path)
+    spec = importlib.util.spec_from_loader("motor_library", loader)
+    lib = importlib.util.module_from_spec(spec)
+    sys.modules["motor_library"] = lib
+    spec.loader.exec_module(lib)
+    if config is not None:
+        lib.set_motor_config(config)
+    return lib
+
+
+def press(gpio, at=None, hold=0.1):
+    """Press a button at virtual time `at` seconds (now if None) for `hold` s.
+
+    START (34) is active high, STOP (0) is active low like on the board.
+    """
+    active = 0 if gpio == STOP_PIN else 1
+    t_us = simhw.clock.now_us if at is None else int(at * 1000000)
+
+    def down():
+        machine.drive(gpio, active)
+
+    def up():
+        machine.release(gpio)
+
+    simhw.clock.call_at(t_us, down)
+    if hold is not None:
+        simhw.clock.call_at(t_us + int(hold * 1000000), up)
+
+
+def set_sensor(n, source):
+    """Set sensor_n (1..3) to a raw ADC value or fn(t_us) -> value."""
+    machine.set_adc(SENSOR_PINS[n - 1], source)
+
+
+def now():
+    """Virtual time in seconds."""
+    return simhw.clock.now_us / 1000000
+
+
+def run_main(seconds, path=None):
+    """Run main.py until `seconds` of virtual time have passed.
+
+    Returns the reason it ended: "timeout", "reset" or "exit".
+    """
+    path = path or os.path.join(REPO_DIR, "main.py")
+    with open(path) as f:
+        code = compile(f.read(), path, "exec")
+    simhw.set_deadline(seconds)
+    try:
+        exec(code, {"__name__": "__main__"})
+    except simhw.SimTimeout:
+        return "timeout"
+    except simhw.SimReset:
+        return "reset"
+    finally:
+        simhw.clock.deadline_us = None
+    return "exit"
+
+
+def summary():
+    counts = {}
+    for _, kind, _, _ in simhw.log:
+        counts[kind] = counts.get(kind, 0) + 1
+    return counts
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=600.0,
+                    help="virtual seconds to run main.py for")
+    ap.add_argument("--start", type=float, default=1.0,
+                    help="press START at this virtual time (s)")
+    ap.add_argument("--hold", type=float, default=None,
+                    help="release START after this many seconds (default: held)")
+    ap.add_argument("--stop", type=float, default=None,
+                    help="press STOP at this virtual time (s)")
+    for n in (1, 2, 3):
+        ap.add_argument("--sensor%d" % n, type=int, default=0,
+                        help="raw ADC value for sensor_%d" % n)
+    ap.add_argument("--tail", type=int, default=20,
+                    help="print the last N logged events")
+    args = ap.parse_args(argv)
+
+    install()
+    for n in (1, 2, 3):
+        set_sensor(n, getattr(args, "sensor%d" % n))
+    if args.start is not None:
+        press(START_PIN, at=args.start, hold=args.hold)
+    if args.stop is not None:
+        press(STOP_PIN, at=args.stop)
+
+    t0 = _wall.perf_counter()
+    reason = run_main(args.seconds)
+    wall_ms = (_wall.perf_counter() - t0) * 1000
+
+    print("ended: %s at %.3f s virtual, %.1f ms wall" % (reason, now(), wall_ms))
+    for kind, n in sorted(summary().items()):
+        print("  %-6s %d events" % (kind, n))
+    for t_us, kind, pin, value in list(simhw.log)[len(simhw.log) - args.tail:]:
+        print("  %12.6f %-6s %-4s %s" % (t_us / 1e6, kind, pin, value))
+
+
+if __name__ == "__main__":
+    main()
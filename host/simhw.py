@@ -0,0 +1,291 @@
+# Shared state for the host-side hardware stand-in.
+#
+# Every fake peripheral (machine.Pin, PWM, ADC, I2C, ssd1306) advances one
+# virtual clock by a small per-operation cost and appends to one event log.
+# time.sleep()/ticks_ms() are redirected to the same clock by patch_time(),
+# so a long motor_library session runs as fast as the CPU allows.
+
+import sys
+import threading
+import time as _real_time
+from collections import deque
+
+TICKS_PERIOD = 1 << 30     # same wrap as MicroPython ticks_*()
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALF = TICKS_PERIOD // 2
+
+# Approximate cost of each operation on an ESP32 running MicroPython, in us.
+# These include interpreter call overhead, not just the peripheral access.
+COST_US = {
+    "pin_init": 20,
+    "pin_read": 8,
+    "pin_write": 8,
+    "pwm_init": 60,
+    "pwm_deinit": 40,
+    "pwm_duty": 25,
+    "pwm_freq": 30,
+    "adc_init": 30,
+    "adc_read": 45,
+    "adc_config": 10,
+    "irq_entry": 40,
+    "timer_entry": 30,
+}
+
+
+class SimTimeout(BaseException):
+    """Raised when virtual time passes the limit set with set_deadline()."""
+
+
+class SimReset(BaseException):
+    """Raised by machine.reset() so a harness can catch a requested reboot."""
+
+
+class VirtualClock:
+    """
+    With one thread, advance() just moves time forward. Once add_thread()
+    is used, every registered thread behaves like it has its own core: an
+    advance() blocks until all of them are advancing, then time moves to
+    the earliest target, so work in one thread costs the others nothing.
+    """
+
+    def __init__(self):
+        self.now_us = 0
+        self.deadline_us = None
+        self._events = []       # [(due_us, seq, fn)] kept sorted
+        self._cond = threading.Condition(threading.RLock())
+        self._parties = None    # token -> target us, None while running
+        self._local = threading.local()
+        self._runner = None     # thread running events, see _advance_to()
+        self._expired = False
+        self._gen = 0
+        self.irq_off = False    # machine.disable_irq(): timer events wait
+
+    def advance(self, us):
+        if us > 0:
+            self._advance_to(self.now_us + int(us))
+
+    def advance_to(self, t_us):
+        if t_us > self.now_us:
+            self._advance_to(int(t_us))
+
+    # ---- threads ----
+    def add_thread(self):
+        """Register a thread about to start; pass the token to bind_thread()."""
+        with self._cond:
+            if self._parties is None:
+                self._parties = {}
+                self.bind_thread(object())      # the calling thread
+            token = object()
+            self._parties[token] = None
+            return token
+
+    def bind_thread(self, token):
+        with self._cond:
+            self._local.token = token
+            self._local.gen = self._gen
+            self._parties[token] = None
+
+    def remove_thread(self):
+        with self._cond:
+            if self._parties is not None and self._local.gen == self._gen:
+                self._parties.pop(self._local.token, None)
+            self._cond.notify_all()
+
+    def _advance_to(self, target):
+        with self._cond:
+            if self._parties is None or self._runner is threading.current_thread():
+                self._run_until(target)     # single thread, or from an event
+                return
+            if self._local.gen != self._gen:
+                raise SystemExit            # left over from before reset()
+            me = self._local.token
+            self._parties[me] = target
+            try:
+                while self.now_us < target:
+                    if self._expired:
+                        raise SimTimeout(self.now_us)
+                    if self._local.gen != self._gen:
+                        raise SystemExit
+                    targets = self._parties.values()
+                    if None not in targets and min(targets) > self.now_us:
+                        self._runner = threading.current_thread()
+                        try:
+                            self._run_until(min(targets))
+                        except SimTimeout:
+                            self._expired = True
+                            raise
+                        finally:
+                            self._runner = None
+                            self._cond.notify_all()
+                    else:
+                        self._cond.wait()
+            finally:
+                if self._parties is not None and me in self._parties:
+                    self._parties[me] = None
+
+    def _run_until(self, target):
+        events = self._events
+        while events and events[0][0] <= target and not self.irq_off:
+            due, _, fn = events.pop(0)
+            if due > self.now_us:
+                self.now_us = due
+            self._check_deadline()
+            fn()
+        # an event callback may itself have advanced past target
+        if target > self.now_us:
+            self.now_us = target
+        self._check_deadline()
+
+    def _check_deadline(self):
+        if self.deadline_us is not None and self.now_us >= self.deadline_us:
+            self.deadline_us = None
+            raise SimTimeout(self.now_us)
+
+    def call_at(self, t_us, fn):
+        """Run fn() when virtual time reaches t_us (microseconds)."""
+        self._seq = getattr(self, "_seq", 0) + 1
+        self._events.append((int(t_us), self._seq, fn))
+        self._events.sort()
+
+    def call_later(self, delay_us, fn):
+        self.call_at(self.now_us + delay_us, fn)
+
+
+clock = VirtualClock()
+log = deque(maxlen=200000)
+logging_enabled = True
+
+
+def cost(kind):
+    clock.advance(COST_US[kind])
+
+
+def record(kind, pin, value):
+    if logging_enabled:
+        log.append((clock.now_us, kind, pin, value))
+
+
+def reset():
+    """Rewind the clock, drop scheduled events and clear the log."""
+    global _busy
+    _pending.clear()
+    _busy = 0
+    with clock._cond:
+        clock.now_us = 0
+        clock.deadline_us = None
+        clock._events = []
+        clock._parties = None
+        clock._expired = False
+        clock.irq_off = False
+        clock._gen += 1         # threads from the last run exit
+        clock._cond.notify_all()
+    log.clear()
+
+
+# ---------------- MicroPython scheduler ----------------
+# Soft IRQs (Pin.irq(hard=False), Timer callbacks) are queued by the
+# firmware and run between bytecodes: never inside a blocking C call such
+# as I2C.writeto(), nor inside another scheduled callback. Code standing in
+# for either runs between enter() and leave(); schedule() queues until then.
+_pending = deque()
+_busy = 0
+
+
+def enter():
+    global _busy
+    _busy += 1
+
+
+def leave():
+    global _busy
+    _busy -= 1
+    while not _busy and _pending:
+        fn = _pending.popleft()
+        _busy += 1
+        try:
+            fn()
+        finally:
+            _busy -= 1
+
+
+def schedule(fn):
+    _pending.append(fn)
+    if not _busy:
+        enter()
+        leave()
+
+
+def set_deadline(seconds):
+    clock.deadline_us = clock.now_us + int(seconds * 1000000)
+
+
+# ---------------- virtual time module ----------------
+def ticks_us():
+    return clock.now_us & TICKS_MAX
+
+
+def ticks_ms():
+    return (clock.now_us // 1000) & TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+
+def ticks_diff(end, start):
+    return ((end - start + TICKS_HALF) & TICKS_MAX) - TICKS_HALF
+
+
+def sleep(seconds):
+    clock.advance(seconds * 1000000)
+
+
+def sleep_ms(ms):
+    clock.advance(ms * 1000)
+
+
+def sleep_us(us):
+    clock.advance(us)
+
+
+def time():
+    return clock.now_us // 1000000
+
+
+class _TimeModule:
+    """Stand-in for MicroPython's time module backed by the virtual clock."""
+
+    sleep = staticmethod(sleep)
+    sleep_ms = staticmethod(sleep_ms)
+    sleep_us = staticmethod(sleep_us)
+    ticks_ms = staticmethod(ticks_ms)
+    ticks_us = staticmethod(ticks_us)
+    ticks_cpu = staticmethod(ticks_cpu)
+    ticks_add = staticmethod(ticks_add)
+    ticks_diff = staticmethod(ticks_diff)
+    time = staticmethod(time)
+
+    def __getattr__(self, name):
+        return getattr(_real_time, name)
+
+
+_saved_time = None
+
+
+def patch_time():
+    """Point `import time` at the virtual clock for modules imported after."""
+    global _saved_time
+    if _saved_time is None:
+        _saved_time = sys.modules.get("time", _real_time)
+        sys.modules["time"] = _TimeModule()
+
+
+def unpatch_time():
+    global _saved_time
+    if _saved_time is not None:
+        sys.modules["time"] = _saved_time
+        _saved_time = None
@@ -0,0 +1,43 @@
+# Host stand-in for MicroPython's `_thread`, installed as sys.modules
+# ["_thread"] by sim.install(). Threads are real CPython threads; each one
+# is registered with the virtual clock so it runs as if on its own core
+# (see simhw.VirtualClock).
+
+import _thread as _real
+
+import simhw
+
+LockType = _real.LockType
+allocate_lock = _real.allocate_lock
+get_ident = _real.get_ident
+
+
+def start_new_thread(function, args, kwargs=None):
+    token = simhw.clock.add_thread()
+
+    def body():
+        simhw.clock.bind_thread(token)
+        try:
+            function(*args, **(kwargs or {}))
+        except (SystemExit, simhw.SimTimeout, simhw.SimReset):
+            pass
+        except BaseException as e:
+            import traceback
+            print("Unhandled exception in thread started by", function)
+            traceback.print_exception(type(e), e, e.__traceback__)
+        finally:
+            simhw.clock.remove_thread()
+
+    return _real.start_new_thread(body, ())
+
+
+def exit():
+    raise SystemExit
+
+
+def stack_size(size=0):
+    return 0
+
+
+def __getattr__(name):
+    return getattr(_real, name)
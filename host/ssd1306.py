@@ -0,0 +1,161 @@
+# Host stand-in for the ssd1306 driver shipped to the board.
+#
+# Same structure and command stream as the MicroPython driver, so I2C byte
+# counts (and therefore virtual flush time) match the real thing. The text
+# drawn since the last fill() is kept in `texts` for inspection, and `gram`
+# mirrors the panel's display RAM as built from the command/data stream,
+# so partial-page updates can be checked against `buffer`.
+
+from micropython import const
+import framebuf
+import simhw
+
+SET_CONTRAST = const(0x81)
+SET_ENTIRE_ON = const(0xA4)
+SET_NORM_INV = const(0xA6)
+SET_DISP = const(0xAE)
+SET_MEM_ADDR = const(0x20)
+SET_COL_ADDR = const(0x21)
+SET_PAGE_ADDR = const(0x22)
+SET_DISP_START_LINE = const(0x40)
+SET_SEG_REMAP = const(0xA0)
+SET_MUX_RATIO = const(0xA8)
+SET_COM_OUT_DIR = const(0xC0)
+SET_DISP_OFFSET = const(0xD3)
+SET_COM_PIN_CFG = const(0xDA)
+SET_DISP_CLK_DIV = const(0xD5)
+SET_PRECHARGE = const(0xD9)
+SET_VCOM_DESEL = const(0xDB)
+SET_CHARGE_PUMP = const(0x8D)
+
+# number of argument bytes that follow each command
+_CMD_ARGS = {
+    SET_CONTRAST: 1, SET_MEM_ADDR: 1, SET_COL_ADDR: 2, SET_PAGE_ADDR: 2,
+    SET_MUX_RATIO: 1, SET_DISP_OFFSET: 1, SET_COM_PIN_CFG: 1,
+    SET_DISP_CLK_DIV: 1, SET_PRECHARGE: 1, SET_VCOM_DESEL: 1,
+    SET_CHARGE_PUMP: 1,
+}
+
+
+class SSD1306(framebuf.FrameBuffer):
+    def __init__(self, width, height, external_vcc):
+        self.width = width
+        self.height = height
+        self.external_vcc = external_vcc
+        self.pages = self.height // 8
+        self.buffer = bytearray(self.pages * self.width)
+        self.gram = bytearray(self.pages * self.width)
+        self._cmd = []
+        self._window = (0, self.width - 1, 0, self.pages - 1)
+        self._ptr = (0, 0)      # GRAM write position, kept across writes
+        self.texts = {}
+        self.shows = 0
+        super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
+        self.init_display()
+
+    def init_display(self):
+        for cmd in (
+            SET_DISP,
+            SET_MEM_ADDR, 0x00,
+            SET_DISP_START_LINE,
+            SET_SEG_REMAP | 0x01,
+            SET_MUX_RATIO, self.height - 1,
+            SET_COM_OUT_DIR | 0x08,
+            SET_DISP_OFFSET, 0x00,
+            SET_COM_PIN_CFG, 0x02 if self.width > 2 * self.height else 0x12,
+            SET_DISP_CLK_DIV, 0x80,
+            SET_PRECHARGE, 0x22 if self.external_vcc else 0xF1,
+            SET_VCOM_DESEL, 0x30,
+            SET_CONTRAST, 0xFF,
+            SET_ENTIRE_ON,
+            SET_NORM_INV,
+            SET_CHARGE_PUMP, 0x10 if self.external_vcc else 0x14,
+            SET_DISP | 0x01,
+        ):
+            self.write_cmd(cmd)
+        self.fill(0)
+        self.show()
+
+    def poweroff(self):
+        self.write_cmd(SET_DISP)
+
+    def poweron(self):
+        self.write_cmd(SET_DISP | 0x01)
+
+    def contrast(self, contrast):
+        self.write_cmd(SET_CONTRAST)
+        self.write_cmd(contrast)
+
+    def invert(self, invert):
+        self.write_cmd(SET_NORM_INV | (invert & 1))
+
+    def fill(self, c):
+        super().fill(c)
+        self.texts = {}
+
+    def text(self, s, x, y, c=1):
+        super().text(s, x, y, c)
+        self.texts[(y, x)] = s
+
+    def show(self):
+        x0 = 0
+        x1 = self.width - 1
+        if self.width == 64:
+            x0 += 32
+            x1 += 32
+        self.write_cmd(SET_COL_ADDR)
+        self.write_cmd(x0)
+        self.write_cmd(x1)
+        self.write_cmd(SET_PAGE_ADDR)
+        self.write_cmd(0)
+        self.write_cmd(self.pages - 1)
+        self.write_data(self.buffer)
+        self.shows += 1
+        simhw.record("oled", None, self.shows)
+
+
+class SSD1306_I2C(SSD1306):
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
+        self.i2c = i2c
+        self.addr = addr
+        self.temp = bytearray(2)
+        self.write_list = [b"\x40", None]
+        super().__init__(width, height, external_vcc)
+
+    def write_cmd(self, cmd):
+        self.temp[0] = 0x80
+        self.temp[1] = cmd
+        self.i2c.writeto(self.addr, self.temp)
+        self._track_cmd(cmd)
+
+    def write_data(self, buf):
+        self.write_list[1] = buf
+        self.i2c.writevto(self.addr, self.write_list)
+        self._track_data(buf)
+
+    def _track_cmd(self, cmd):
+        self._cmd.append(cmd)
+        if len(self._cmd) <= _CMD_ARGS.get(self._cmd[0], 0):
+            return
+        op = self._cmd[0]
+        c0, c1, p0, p1 = self._window
+        if op == SET_COL_ADDR:
+            c0, c1 = self._cmd[1], self._cmd[2]
+        elif op == SET_PAGE_ADDR:
+            p0, p1 = self._cmd[1], self._cmd[2]
+        self._window = (c0, c1, p0, p1)
+        if op in (SET_COL_ADDR, SET_PAGE_ADDR):
+            self._ptr = (c0, p0)
+        self._cmd = []
+
+    def _track_data(self, buf):
+        # horizontal addressing: column wraps within the window, then page
+        c0, c1, p0, p1 = self._window
+        col, page = self._ptr
+        for b in bytes(buf):
+            self.gram[page * self.width + col] = b
+            col += 1
+            if col > c1:
+                col = c0
+                page = page + 1 if page < p1 else p0
+        self._ptr = (col, page)
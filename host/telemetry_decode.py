@@ -0,0 +1,148 @@
+"""Decode telemetry frames from telemetry.py into CSV or NumPy arrays.
+
+Frames can come straight off UDP (one frame per datagram, any number of
+robots) or from a capture file / serial dump, where frames are found by
+their b"ET" sync bytes.
+
+    python host/telemetry_decode.py --udp 4211 --seconds 30 -o run.csv
+    python host/telemetry_decode.py --file capture.bin -o run.csv
+"""
+
+import struct
+import sys
+
+REC_FMT = "<I5HBB3HHI"
+RECORD_SIZE = struct.calcsize(REC_FMT)
+HDR_FMT = "<2sBHHBB"
+HEADER_SIZE = struct.calcsize(HDR_FMT)
+VERSION = 1
+TICKS_PERIOD = 1 << 30
+
+MOTORS = ("front_left", "front_right", "back_left", "back_right",
+          "extra_motor")
+COLUMNS = (("src", "frame", "t_ms")
+           + tuple("duty_" + m for m in MOTORS)
+           + tuple("dir_" + m for m in MOTORS)
+           + ("mask", "raw1", "raw2", "raw3", "loop_us", "mem_free"))
+
+
+class Decoder:
+    """Turns frames into rows; keeps per-source time unwrapping and loss counts."""
+
+    def __init__(self):
+        self.rows = []
+        self.lost_frames = 0
+        self.dropped = 0        # records the robot overwrote before sending
+        self.bad = 0
+        self._last = {}         # src -> (frame seq, dropped, last raw t, t offset)
+
+    def frame(self, data, src=""):
+        """Decode one frame; returns the number of records, 0 if malformed."""
+        if len(data) < HEADER_SIZE:
+            self.bad += 1
+            return 0
+        sync, ver, seq, dropped, n, size = struct.unpack_from(HDR_FMT, data)
+        if sync != b"ET" or ver != VERSION or size != RECORD_SIZE or \
+                len(data) < HEADER_SIZE + n * size:
+            self.bad += 1
+            return 0
+        last_seq, last_dropped, last_t, offset = self._last.get(src, (None, 0, None, 0))
+        if last_seq is not None:
+            self.lost_frames += (seq - last_seq - 1) & 0xFFFF
+            self.dropped += (dropped - last_dropped) & 0xFFFF
+        else:
+            self.dropped += dropped
+        for k in range(n):
+            rec = struct.unpack_from(REC_FMT, data, HEADER_SIZE + k * size)
+            t = rec[0]
+            if last_t is not None and t < last_t:
+                offset += TICKS_PERIOD          # ticks_ms() wrapped
+            last_t = t
+            dirs = rec[6]
+            self.rows.append((src, seq, t + offset) + rec[1:6]
+                             + tuple((dirs >> i) & 1 for i in range(5))
+                             + rec[7:])
+        self._last[src] = (seq, dropped, last_t, offset)
+        return n
+
+    def stream(self, data, src=""):
+        """Decode every frame in a byte stream (e.g. a serial capture)."""
+        i = 0
+        while True:
+            i = data.find(b"ET", i)
+            if i < 0 or len(data) - i < HEADER_SIZE:
+                return
+            n = data[i + 7]
+            end = i + HEADER_SIZE + n * RECORD_SIZE
+            if end > len(data):
+                return
+            if self.frame(data[i:end], src):
+                i = end
+            else:
+                i += 1
+
+    def write_csv(self, f):
+        import csv
+        w = csv.writer(f)
+        w.writerow(COLUMNS)
+        w.writerows(self.rows)
+
+    def to_numpy(self):
+        """Rows as a NumPy structured array (needs numpy)."""
+        import numpy as np
+        dtype = [("src", "U32")] + [(c, "i8") for c in COLUMNS[1:]]
+        return np.array(self.rows, dtype=dtype)
+
+
+def listen(port, seconds, decoder=None):
+    """Collect UDP frames from every robot for `seconds`."""
+    import socket
+    import time
+
+    decoder = decoder or Decoder()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("0.0.0.0", port))
+    sock.settimeout(0.2)
+    end = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < end:
+            try:
+                data, (host, _) = sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            decoder.frame(data, host)
+    finally:
+        sock.close()
+    return decoder
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--udp", type=int, metavar="PORT")
+    src.add_argument("--file")
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("-o", "--output", help="CSV file (default stdout)")
+    args = ap.parse_args(argv)
+
+    if args.udp:
+        dec = listen(args.udp, args.seconds)
+    else:
+        dec = Decoder()
+        with open(args.file, "rb") as f:
+            dec.stream(f.read(), args.file)
+
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            dec.write_csv(f)
+    else:
+        dec.write_csv(sys.stdout)
+    print("%d records, %d frames lost, %d records dropped on robot, %d bad"
+          % (len(dec.rows), dec.lost_frames, dec.dropped, dec.bad),
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# Host stand-in for MicroPython's `uasyncio` (the subset motor_async uses).
+#
+# Tasks are stepped by a small run loop that sleeps on the virtual clock in
+# simhw, so timers and button IRQs scheduled there fire between task steps
+# the same way they would on the board.
+
+import simhw
+
+
+class CancelledError(BaseException):
+    pass
+
+
+class _Sleep:
+    def __init__(self, us):
+        self.us = us
+
+    def __await__(self):
+        yield self.us
+
+
+def sleep(seconds):
+    return _Sleep(int(seconds * 1000000))
+
+
+def sleep_ms(ms):
+    return _Sleep(int(ms) * 1000)
+
+
+class Task:
+    def __init__(self, coro):
+        self.coro = coro
+        self.result = None
+        self.exc = None
+        self._done = False
+        self._gen = 0           # bumped on every (re)schedule, stale entries skipped
+        self._waiters = []
+
+    def done(self):
+        return self._done
+
+    def cancel(self):
+        if self._done:
+            return False
+        for t in _loop.tasks:
+            if self in t._waiters:
+                t._waiters.remove(self)
+        _loop.schedule(self, 0, CancelledError())
+        return True
+
+    def __await__(self):
+        if not self._done:
+            yield self
+        if self.exc is not None:
+            raise self.exc
+        return self.result
+
+
+class _Loop:
+    def __init__(self):
+        self.queue = []         # [wake_us, seq, task, gen, exc], kept sorted
+        self.tasks = []
+        self.seq = 0
+
+    def schedule(self, task, delay_us, exc=None):
+        task._gen += 1
+        self.seq += 1
+        entry = [simhw.clock.now_us + max(0, delay_us), self.seq, task,
+                 task._gen, exc]
+        i = len(self.queue)
+        while i and self.queue[i - 1][:2] > entry[:2]:
+            i -= 1
+        self.queue.insert(i, entry)
+
+    def create(self, coro):
+        task = Task(coro)
+        self.tasks.append(task)
+        self.schedule(task, 0)
+        return task
+
+    def _finish(self, task, result=None, exc=None):
+        task._done = True
+        task.result = result
+        task.exc = exc
+        self.tasks.remove(task)
+        for t in task._waiters:
+            self.schedule(t, 0)
+        task._waiters = []
+
+    def step(self, task, exc):
+        try:
+            if exc is None:
+                y = task.coro.send(None)
+            else:
+                y = task.coro.throw(exc)
+        except StopIteration as e:
+            self._finish(task, e.value)
+            return
+        except (Exception, CancelledError) as e:
+            self._finish(task, exc=e)
+            return
+        if isinstance(y, Task):
+            if y._done:
+                self.schedule(task, 0)
+            else:
+                y._waiters.append(task)
+        else:
+            self.schedule(task, y or 0)
+
+    def run_until(self, main):
+        while not main._done:
+            if not self.queue:
+                raise RuntimeError("every task is blocked")
+            wake, _, task, gen, exc = self.queue.pop(0)
+            if gen != task._gen or task._done:
+                continue
+            simhw.clock.advance_to(wake)
+            self.step(task, exc)
+
+
+_loop = _Loop()
+
+
+def create_task(coro):
+    return _loop.create(coro)
+
+
+def run(coro):
+    global _loop
+    _loop = _Loop()
+    main = _loop.create(coro)
+    _loop.run_until(main)
+    if main.exc is not None:
+        raise main.exc
+    return main.result
+
+
+async def gather(*aws, return_exceptions=False):
+    tasks = [a if isinstance(a, Task) else create_task(a) for a in aws]
+    results = []
+    for t in tasks:
+        try:
+            results.append(await t)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
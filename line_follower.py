@@ -0,0 +1,140 @@
+import time
+import motor_library as ml
+
+
+# ---------------- Line Follower ----------------
+# PID on the line position seen by the three IR sensors, run at a fixed
+# tick rate. Sensors are assumed left (sensor_1), centre (sensor_2) and
+# right (sensor_3); swap the weights if yours are mounted the other way.
+class LineFollower:
+    def __init__(self, kp=1.0, ki=0.0, kd=0.05, rate_hz=100,
+                 base_speed=50, min_speed=25, max_turn=60,
+                 weights=(-100, 0, 100), search_turn=40, lost_timeout=1.0):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.period_us = 1000000 // rate_hz
+        self.base_speed = base_speed    # forward speed on a centred line
+        self.min_speed = min_speed      # forward speed at full error
+        self.max_turn = max_turn        # limit on the turn command
+        self.weights = weights
+        self.search_turn = search_turn  # turn speed while the line is lost
+        self.lost_timeout_us = int(lost_timeout * 1000000)
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.last_error = 0
+        self.have_last = False      # last_error is from the previous tick
+        self.lost_since = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.ticks = 0
+        self.overruns = 0           # ticks that started a full period late
+        self.max_jitter_us = 0
+        self.t_first = None
+        self.t_last = None
+
+    def stats(self):
+        hz = 0
+        if self.ticks > 1:
+            span = time.ticks_diff(self.t_last, self.t_first)
+            if span > 0:
+                hz = (self.ticks - 1) * 1000000 / span
+        return {"ticks": self.ticks, "hz": hz,
+                "max_jitter_us": self.max_jitter_us,
+                "overruns": self.overruns}
+
+    def error(self, raw):
+        # Weighted line position, -100 (far left) .. 100 (far right), from
+        # how far each reading is above the lowest of the three (background)
+        w = self.weights
+        floor = min(raw[0], raw[1], raw[2])
+        a0 = raw[0] - floor
+        a1 = raw[1] - floor
+        a2 = raw[2] - floor
+        total = a0 + a1 + a2
+        if total <= 0:
+            return self.last_error
+        return (w[0] * a0 + w[1] * a1 + w[2] * a2) // total
+
+    def step(self, dt_us=None):
+        """One control update: read sensors, run PID, drive the wheels."""
+        mask, raw = ml.read_sensors()
+        now = time.ticks_us()
+
+        if not mask:
+            self.have_last = False
+            if self.lost_since is None:
+                self.lost_since = now
+            if time.ticks_diff(now, self.lost_since) > self.lost_timeout_us:
+                ml.stop_drive()
+                return False
+            # Spin toward the side the line was last seen on
+            turn = -self.search_turn if self.last_error > 0 else self.search_turn
+            ml.drive(0, 0, turn)
+            return True
+        self.lost_since = None
+
+        dt = (dt_us or self.period_us) / 1000000
+        err = self.error(raw)
+        self.integral += err * dt
+        limit = self.max_turn / self.ki if self.ki else 0
+        if self.integral > limit:
+            self.integral = limit
+        elif self.integral < -limit:
+            self.integral = -limit
+        # No D term on the first tick or when the line is found again:
+        # there is no previous error to take a difference from
+        deriv = (err - self.last_error) / dt if self.have_last else 0
+        self.last_error = err
+        self.have_last = True
+
+        u = self.kp * err + self.ki * self.integral + self.kd * deriv
+        if u > self.max_turn:
+            u = self.max_turn
+        elif u < -self.max_turn:
+            u = -self.max_turn
+
+        # Slow down in proportion to how far off the line we are
+        a = abs(err)
+        speed = self.base_speed - (self.base_speed - self.min_speed) * a // 100
+        ml.drive(speed, 0, -u)      # line to the right -> turn clockwise
+        return True
+
+    def run(self, duration=None):
+        """
+        Follow the line at rate_hz until duration (s) passes, STOP is
+        pressed or the line stays lost for lost_timeout. Needs _running,
+        i.e. call after wait_for_start().
+        """
+        period = self.period_us
+        start = time.ticks_us()
+        end = None if duration is None else time.ticks_add(start, int(duration * 1000000))
+        due = start
+        last = None
+        while ml.is_running():
+            now = time.ticks_us()
+            late = time.ticks_diff(now, due)
+            if late > self.max_jitter_us:
+                self.max_jitter_us = late
+            if late >= period:
+                self.overruns += 1
+                due = now           # don't try to catch up missed ticks
+            if self.t_first is None:
+                self.t_first = now
+            self.t_last = now
+            self.ticks += 1
+
+            dt = period if last is None else time.ticks_diff(now, last)
+            if not self.step(dt or period):
+                break
+            last = now
+
+            if end is not None and time.ticks_diff(end, now) <= 0:
+                break
+            due = time.ticks_add(due, period)
+            if not ml._wait_until(due):
+                break
+        ml.stop_drive()
@@ -15,6 +15,12 @@ while True:
         FW(speed=50)
     else:
         stop_drive(FW)
+
+#     # PID line following instead of the FW/stop_drive above:
+#     from line_follower import LineFollower
+#     follower = LineFollower(kp=1.0, kd=0.05, base_speed=50)
+#     follower.run()
+#     print(follower.stats())
     
 #     led_on()
 #     buzz(1, 10)   #buzzer (duration, no. of beeps for the duration
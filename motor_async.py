@@ -0,0 +1,163 @@
+import time
+import motor_library as ml
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+
+# ---------------- Async API ----------------
+# Cooperative versions of the blocking motor_library calls, for use inside
+# uasyncio tasks. They drive the same motors and STOP state, so the blocking
+# API keeps working as before; just don't call it from a task, it would
+# hold up every other task until it returns.
+#
+#     import motor_async as ma
+#
+#     async def main():
+#         await ma.wait_for_start()
+#         await ma.movement("FW", 80, 2)
+#
+#     ma.run(main())
+
+async def check_stop():
+    if ml._stop_requested and not ml._running:
+        return      # already halted, waiting for wait_for_start()
+
+    if ml._stop_requested or ml.button_stop.value() == 0:
+        ml._halt()
+
+        while ml.button_stop.value() == 0:
+            await asyncio.sleep_ms(50)
+
+        if not ml.RESET_ON_STOP:
+            ml._soft_recover()
+            print("Stopped. Press START to resume.")
+            return
+
+        while ml.button_start.value() == 0:
+            await asyncio.sleep_ms(50)
+
+        ml._restart()
+
+
+async def wait_until(deadline):
+    # Like motor_library._wait_until(), other tasks run while this sleeps
+    while True:
+        await check_stop()
+        if not ml._running:
+            ml.stop_all()
+            return False
+        left = time.ticks_diff(deadline, time.ticks_us())
+        if left <= 0:
+            return True
+        if left > ml.STOP_POLL_US:
+            left = ml.STOP_POLL_US
+        await asyncio.sleep_ms((left + 999) // 1000)
+
+
+async def wait(duration):
+    return await wait_until(ml._deadline(duration))
+
+
+async def movement(motion, speed=100, duration=1.5, direction=1):
+    if not ml._running:
+        ml.stop_all()
+        return
+
+    deadline = ml._deadline(duration)
+    if motion not in ml._motion_steps and motion not in ml.motors:
+        print("Unknown motion:", motion)
+        return
+
+    await check_stop()
+    if not ml._running:
+        ml.stop_all()
+        return
+
+    if time.ticks_diff(deadline, time.ticks_us()) > 0:
+        ml._start_motion(motion, speed, direction)
+        await wait_until(deadline)
+
+    ml.stop_all()
+
+
+async def run_motor(name, speed, duration, direction=1):
+    await check_stop()
+    if name in ml.motors:
+        m = ml.motors[name]
+        ml._set_target(m, direction, ml._motor_duty(m, speed))
+        await wait(duration)
+        ml._set_target(m, direction, 0)
+
+
+async def wait_for_start():
+    print("Waiting for START button (D34)...")
+    while ml.button_start.value() == 0:
+        await wait(0.01)
+    print("START pressed!")
+    ml._resume()
+
+
+# ---------------- Background Tasks ----------------
+async def stop_monitor(period_ms=10):
+    # Runs the halt flow even while no task is inside wait()
+    while True:
+        await check_stop()
+        await asyncio.sleep_ms(period_ms)
+
+
+async def sampler(rate_hz=100, history=64):
+    """
+    The background sampler as a task instead of a hardware timer:
+    sensor_N(), read_sensors(), drain_samples() and on_edge() behave as
+    after start_sampler().
+    """
+    period = 1000 // rate_hz
+    ml.start_sampler(rate_hz, history, timer=False)
+    try:
+        while True:
+            ml._sample_tick(None)
+            await asyncio.sleep_ms(period)
+    finally:
+        ml.stop_sampler()
+
+
+async def display(fps=10):
+    # Draws the newest oled_status()/oled_mode() request at most fps times
+    # a second, in place of the OLED timer
+    ml.oled_rate(fps, timer=False)
+    try:
+        while True:
+            ml.oled_flush()
+            await asyncio.sleep_ms(1000 // fps)
+    finally:
+        ml.oled_rate(fps)
+
+
+def run(*routines, stop_ms=10, sensors_hz=100, display_fps=10):
+    """
+    Run routines (coroutines, e.g. run(main(), blink())) concurrently with
+    the STOP monitor, sensor sampler and display tasks until every routine
+    has returned, then stop the motors. 0 leaves that background task out.
+    Returns the routines' results.
+    """
+    return asyncio.run(_main(routines, stop_ms, sensors_hz, display_fps))
+
+
+async def _main(routines, stop_ms, sensors_hz, display_fps):
+    background = []
+    if stop_ms:
+        background.append(asyncio.create_task(stop_monitor(stop_ms)))
+    if sensors_hz:
+        background.append(asyncio.create_task(sampler(sensors_hz)))
+    if display_fps:
+        background.append(asyncio.create_task(display(display_fps)))
+    try:
+        return await asyncio.gather(*routines)
+    finally:
+        for t in background:
+            t.cancel()
+        await asyncio.sleep_ms(0)   # let their cleanup run
+        ml.stop_all()
@@ -2,37 +2,223 @@ from machine import Pin, PWM, I2C, ADC
 import time
 import machine
 import ssd1306
+from array import array
 
 # -------- OLED INIT --------
-i2c = I2C(0, scl=Pin(22), sda=Pin(21))
-oled = ssd1306.SSD1306_I2C(128, 64, i2c)
+# The driver is created on the first draw, not at import. `oled` and `i2c`
+# are stand-ins that create it on first use, so code that draws on oled
+# directly (also after `from motor_library import *`) keeps working.
+_i2c = None
+_oled = None
+
+# Only lines whose text changed are redrawn, and only their SSD1306 pages
+# are sent instead of the whole 1 KB frame. Code that draws on `oled`
+# directly should call oled_flush() first and oled_invalidate() after.
+_oled_screen = None        # "status", "mode" or None (contents unknown)
+_oled_lines = [None, None, None, None]
+_oled_stats = [0, 0, 0, 0] # [flushes, bytes sent, us flushing, dropped]
+
+# oled_status()/oled_mode()/oled_clear() only record the newest request;
+# a timer draws it at most OLED_MAX_FPS times a second, so callers never
+# wait for the I2C transfer and screens replaced before the next frame are
+# dropped. OLED_MAX_FPS = 0 (or oled_rate(0)) draws inline as before.
+OLED_TIMER_ID = 2
+OLED_MAX_FPS = 10
+
+_oled_timer = None
+_oled_use_timer = True
+_oled_pending = None        # (draw function, args) last requested
+_oled_posted = 0            # requests made / drawn; they differ while one
+_oled_drawn = 0             # is pending. Safe with a drawing thread too.
+
+
+def _oled_init():
+    global _i2c, _oled, _oled_screen
+    _i2c = I2C(0, scl=Pin(22), sda=Pin(21))
+    _oled = ssd1306.SSD1306_I2C(128, 64, _i2c)
+    # the driver's init leaves a blank screen on the panel
+    _oled_screen = "status"
+    for i in range(4):
+        _oled_lines[i] = ""
+
+
+def get_oled():
+    if _oled is None:
+        _oled_init()
+    return _oled
+
+
+class _LazyOled:
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        if _oled is None:
+            _oled_init()
+        return getattr(_oled if self._name == "oled" else _i2c, attr)
+
+
+oled = _LazyOled("oled")
+i2c = _LazyOled("i2c")
+
+
+def oled_invalidate():
+    global _oled_screen
+    _oled_screen = None
+
+
+def oled_stats():
+    return {"flushes": _oled_stats[0], "bytes": _oled_stats[1],
+            "flush_us": _oled_stats[2], "dropped": _oled_stats[3]}
+
+
+def reset_oled_stats():
+    _oled_stats[0] = 0
+    _oled_stats[1] = 0
+    _oled_stats[2] = 0
+    _oled_stats[3] = 0
+
+
+def _oled_count(t0, n):
+    _oled_stats[0] += 1
+    _oled_stats[1] += n + 13    # six 2-byte commands + data control byte
+    _oled_stats[2] += time.ticks_diff(time.ticks_us(), t0)
+
+
+def _oled_show():
+    _oled_flush(0, _oled.height // 8 - 1)
+
+
+def _oled_flush(p0, p1):
+    # Send pages p0..p1 only, using the column/page address window. One
+    # I2C transfer per page (~3 ms): soft IRQs such as STOP cannot run
+    # during a transfer, so a whole frame at once would hold them ~23 ms.
+    t0 = time.ticks_us()
+    w = _oled.width
+    _oled.write_cmd(0x21)    # SET_COL_ADDR
+    _oled.write_cmd(0)
+    _oled.write_cmd(w - 1)
+    _oled.write_cmd(0x22)    # SET_PAGE_ADDR
+    _oled.write_cmd(p0)
+    _oled.write_cmd(p1)
+    buf = memoryview(_oled.buffer)
+    for p in range(p0, p1 + 1):
+        _oled.write_data(buf[p * w:(p + 1) * w])
+    _oled_count(t0, (p1 - p0 + 1) * w)
+
+
+def _oled_line(i, text, x, y):
+    if _oled_lines[i] == text:
+        return
+    _oled_lines[i] = text
+    _oled.fill_rect(0, y, _oled.width, 8, 0)
+    _oled.text(text, x, y)
+    _oled_flush(y >> 3, (y + 7) >> 3)
+
+
+def oled_rate(fps, timer=True):
+    """
+    Max OLED frames per second drawn from the timer. 0 stops the timer and
+    draws every later call inline (anything still pending is drawn now).
+    timer=False starts no timer; the caller runs oled_flush() at fps.
+    """
+    global OLED_MAX_FPS, _oled_timer, _oled_use_timer
+    OLED_MAX_FPS = fps
+    _oled_use_timer = timer
+    if _oled_timer is not None:
+        _oled_timer.deinit()
+        _oled_timer = None
+    if fps > 0 and timer:
+        _oled_timer = machine.Timer(OLED_TIMER_ID)
+        _oled_timer.init(freq=fps, mode=machine.Timer.PERIODIC,
+                         callback=_oled_tick)
+    elif fps <= 0:
+        oled_flush()
+
+
+def oled_flush():
+    # Draw the pending screen now, e.g. before a reset or deep sleep
+    global _oled_drawn
+    n = _oled_posted
+    if n != _oled_drawn:
+        p = _oled_pending       # set before _oled_posted, so never older
+        p[0](*p[1])
+        _oled_drawn = n
+
+
+def _oled_tick(t):
+    oled_flush()
+
+
+def _oled_post(fn, args):
+    global _oled_pending, _oled_posted
+    if OLED_MAX_FPS <= 0:
+        fn(*args)
+        return
+    if _oled_posted != _oled_drawn:
+        _oled_stats[3] += 1
+    _oled_pending = (fn, args)
+    _oled_posted += 1
+    if _oled_timer is None and _oled_use_timer:
+        oled_rate(OLED_MAX_FPS)
+
 
 def oled_clear():
-    oled.fill(0)
-    oled.show()
+    _oled_post(_oled_draw_clear, ())
 
 def oled_status(line1="", line2="", line3="", line4=""):
-    oled.fill(0)
-    oled.text(line1, 0, 0)
-    oled.text(line2, 0, 18)
-    oled.text(line3, 0, 36)
-    oled.text(line4, 0, 55)
-    oled.show()
+    _oled_post(_oled_draw_status, (line1, line2, line3, line4))
 
 def oled_mode(mode):
-    oled.fill(0)
-    oled.text("MODE", 40, 0)
-    oled.text(mode, 40, 25)
-    oled.show()
+    _oled_post(_oled_draw_mode, (mode,))
+
+
+def _oled_draw_clear():
+    global _oled_screen
+    if _oled is None:
+        _oled_init()
+    _oled.fill(0)
+    _oled_show()
+    _oled_screen = "status"
+    for i in range(4):
+        _oled_lines[i] = ""
+
+def _oled_draw_status(line1, line2, line3, line4):
+    global _oled_screen
+    if _oled is None:
+        _oled_init()
+    if _oled_screen != "status":
+        _oled.fill(0)
+        _oled.text(line1, 0, 0)
+        _oled.text(line2, 0, 18)
+        _oled.text(line3, 0, 36)
+        _oled.text(line4, 0, 55)
+        _oled_show()
+        _oled_screen = "status"
+        _oled_lines[0] = line1
+        _oled_lines[1] = line2
+        _oled_lines[2] = line3
+        _oled_lines[3] = line4
+        return
+    _oled_line(0, line1, 0, 0)
+    _oled_line(1, line2, 0, 18)
+    _oled_line(2, line3, 0, 36)
+    _oled_line(3, line4, 0, 55)
+
+def _oled_draw_mode(mode):
+    global _oled_screen
+    if _oled is None:
+        _oled_init()
+    if _oled_screen != "mode":
+        _oled.fill(0)
+        _oled.text("MODE", 40, 0)
+        _oled.text(mode, 40, 25)
+        _oled_show()
+        _oled_screen = "mode"
+        _oled_lines[0] = mode
+        return
+    _oled_line(0, mode, 40, 25)
     
-_adc1 = ADC(Pin(39))  # VN
-_adc2 = ADC(Pin(36))  # VP
-_adc3 = ADC(Pin(35))  # D35
-
-for a in (_adc1, _adc2, _adc3):
-    a.atten(ADC.ATTN_11DB)
-    a.width(ADC.WIDTH_12BIT)
-
 THRESHOLD = 2000   # set once here
 
 # ===== HARD FAIL-SAFE RESET (runs after Thonny STOP, crash, reboot) =====
@@ -54,36 +240,90 @@ for p in ALL_DIR_PINS:
 # ======================================================================
 
 
-# Replace default wait with safety-checked wait
-def wait(duration):
-    interval = 0.05
-    elapsed = 0
-    while elapsed < duration:
+# ---------------- Timing ----------------
+STOP_POLL_US = 10000   # longest sleep between STOP checks while waiting
+_idle = None           # called on every poll while waiting, see add_idle()
+_idle_hooks = ()
+
+
+def _wait_until(deadline):
+    # Sleep until ticks_us() reaches deadline, checking STOP at least every
+    # STOP_POLL_US. Returns False (motors stopped) if STOP ended the wait.
+    while True:
         check_stop()
         if not _running:
             stop_all()
-            return
-        time.sleep(interval)
-        elapsed += interval
+            return False
+        if _idle is not None:
+            _idle()
+        left = time.ticks_diff(deadline, time.ticks_us())
+        if left <= 0:
+            return True
+        time.sleep_us(left if left < STOP_POLL_US else STOP_POLL_US)
+
+
+def add_idle(fn):
+    """
+    Call fn() on every STOP poll while waiting (wait(), movement(), ...).
+    Used by motor_threads and telemetry; any number of hooks can be added.
+    """
+    global _idle_hooks
+    if fn not in _idle_hooks:
+        _idle_hooks += (fn,)
+    _set_idle()
+
+
+def remove_idle(fn):
+    global _idle_hooks
+    _idle_hooks = tuple(h for h in _idle_hooks if h is not fn)
+    _set_idle()
+
+
+def _set_idle():
+    # One hook is called directly; only several go through _run_idle()
+    global _idle
+    if not _idle_hooks:
+        _idle = None
+    elif len(_idle_hooks) == 1:
+        _idle = _idle_hooks[0]
+    else:
+        _idle = _run_idle
 
 
-# ---------------- FAIL-SAFE MOTOR RESET ----------------
-def _reset_all_pwm_and_dir():
-    used_pwm_pins = set()
-    used_dir_pins = set()
+def _run_idle():
+    for fn in _idle_hooks:
+        fn()
+
 
-    for cfg in motor_configs.values():
-        for motor in cfg.values():
-            used_pwm_pins.add(motor["pwm"])
-            used_dir_pins.add(motor["dir"])
+_last_duration = None
+_last_duration_us = 0
 
-    for p in used_pwm_pins:
+
+def _deadline(duration):
+    # duration * 1000000 boxes a float on the heap. Loops tend to wait the
+    # same time over and over, so the last conversion is kept.
+    global _last_duration, _last_duration_us
+    if duration != _last_duration:
+        _last_duration_us = int(duration * 1000000)
+        _last_duration = duration
+    return time.ticks_add(time.ticks_us(), _last_duration_us)
+
+
+# Replace default wait with safety-checked wait
+def wait(duration):
+    _wait_until(_deadline(duration))
+
+
+# ---------------- FAIL-SAFE MOTOR RESET ----------------
+def _reset_all_pwm_and_dir():
+    # Every pin any config uses, as pwm or dir
+    for p in _ALL_MOTOR_PINS:
         try:
             PWM(Pin(p)).deinit()
         except:
             pass
 
-    for p in used_dir_pins:
+    for p in _ALL_MOTOR_PINS:
         try:
             Pin(p, Pin.OUT).value(0)
         except:
@@ -93,8 +333,8 @@ def _reset_all_pwm_and_dir():
 # ---------------- Servo Class ----------------
 class Servo:
     def __init__(self, pin):
-        self.pwm = PWM(Pin(pin))
-        self.pwm.freq(50)
+        self.pin = pin
+        self.pwm = None     # PWM channel is set up on the first pos()
 
         # Calibrated limits (adjust if needed)
         self.min_duty = 26     # ~0°
@@ -104,6 +344,9 @@ class Servo:
         """
         position: 0.0 (min) to 1.0 (max)
         """
+        if self.pwm is None:
+            self.pwm = PWM(Pin(self.pin))
+            self.pwm.freq(50)
         position = max(0.0, min(1.0, position))
         duty = int(
             self.min_duty +
@@ -122,263 +365,401 @@ servo4 = Servo(26)
 
 
 # ---------------- Motor Configurations ----------------
-motor_configs = {
-    "ONE": {       #rohit sir
-        "front_left": {"pwm": 4, "dir": 5},
-        "front_right": {"pwm": 13, "dir": 14},
-        "back_left": {"pwm": 18, "dir": 19},
-        "back_right": {"pwm": 17, "dir": 16},
-        "extra_motor": {"pwm": 25, "dir": 23},
-    },
-    "TWO": {       #rohit sir
-        "front_left": {"pwm": 18, "dir": 19},
-        "front_right": {"pwm": 23, "dir": 25},
-        "back_left": {"pwm": 16, "dir": 17},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "THREE": {
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "FOUR": {
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "FIVE": {
-        "front_left": {"pwm": 23, "dir": 25},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 16, "dir": 17},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "SIX": {    #OSHIWARA
-        "front_left": {"pwm": 23, "dir": 25},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 16, "dir": 17},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "SEVEN": {       #rohit sir
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "EIGHT": {     #KANDIVALI
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "NINE": {       #rohit sir
-        "front_left": {"pwm": 23, "dir": 25},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 16, "dir": 17},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "TEN": {       #rohit sir
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "ELEVEN": {     #JUHU
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "TWELVE": {        #SOBO MUMBAI
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "THIRTEEN": {      #SOBO MUMBAI
-        "front_left": {"pwm": 5, "dir": 4},
-        "front_right": {"pwm": 14, "dir": 13},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 19, "dir": 18},
-        "extra_motor": {"pwm": 25, "dir": 23},
-    },
-    "FOURTEEN": {     #SURAT
-        "front_left": {"pwm": 5, "dir": 4},
-        "front_right": {"pwm": 14, "dir": 13},
-        "back_left": {"pwm": 18, "dir": 19},
-        "back_right": {"pwm": 16, "dir": 17},
-        "extra_motor": {"pwm": 25, "dir": 23},
-    },
-    "FIFTEEN": {      #SURAT
-        "front_left": {"pwm": 19, "dir": 18},
-        "front_right": {"pwm": 17, "dir": 16},
-        "back_left": {"pwm": 13, "dir": 14},
-        "back_right": {"pwm": 4, "dir": 5},
-        "extra_motor": {"pwm": 25, "dir": 13},
-    },
-    "SIXTEEN": {      #SURAT
-        "front_left": {"pwm": 5, "dir": 4},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 23, "dir": 25},
-    },
-    "SEVENTEEN": {     #SURAT
-        "front_left": {"pwm": 18, "dir": 19},
-        "front_right": {"pwm": 23, "dir": 25},
-        "back_left": {"pwm": 13, "dir": 14},
-        "back_right": {"pwm": 17, "dir": 16},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "EIGHTEEN": {      #SURAT
-        "front_left": {"pwm": 14, "dir": 13},
-        "front_right": {"pwm": 5, "dir": 4},
-        "back_left": {"pwm": 18, "dir": 19},
-        "back_right": {"pwm": 16, "dir": 17},
-        "extra_motor": {"pwm": 23, "dir": 25},
-    },
-    "NINETEEN": {       #SURAT
-        "front_left": {"pwm": 18, "dir": 19},
-        "front_right": {"pwm": 23, "dir": 25},
-        "back_left": {"pwm": 13, "dir": 14},
-        "back_right": {"pwm": 16, "dir": 17},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "TWENTY": {      # Satellite Ahmedabad
-        "front_left": {"pwm": 18, "dir": 19},
-        "front_right": {"pwm": 16, "dir": 17},
-        "back_left": {"pwm": 13, "dir": 14},
-        "back_right": {"pwm": 4, "dir": 5},
-        "extra_motor": {"pwm": 23, "dir": 25},
-    },
-    "TWENTYONE": {      #SBR Ahmedabad
-        "front_left": {"pwm": 17, "dir": 16},
-        "front_right": {"pwm": 14, "dir": 13},
-        "back_left": {"pwm": 25, "dir": 23},
-        "back_right": {"pwm": 19, "dir": 18},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "TWENTYTWO": {      # Satellite Ahmedabad
-        "front_left": {"pwm": 18, "dir": 19},
-        "front_right": {"pwm": 17, "dir": 16},
-        "back_left": {"pwm": 13, "dir": 14},
-        "back_right": {"pwm": 25, "dir": 23},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-    "TWENTYTHREE": {   #South Bopal Ahmedabad
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "TWENTYFOUR": {     #Adani Ahmedabad
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 17, "dir": 16},
-        "back_left": {"pwm": 14, "dir": 13},
-        "back_right": {"pwm": 19, "dir": 18},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "TWENTYFIVE": {    #Adani Ahmedabad
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "TWENTYSIX": {    #Adani Ahmedabad
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "TWENTYSEVEN": {    #Adani Ahmedabad
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "TWENTYEIGHT": {     #South Bopal Ahmedabad
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "TWENTYNINE": {      #South Bopal Ahmedabad
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 19, "dir": 18},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 14, "dir": 13},
-        "extra_motor": {"pwm": 5, "dir": 4},
-    },
-    "THIRTY": {      #YET TO CONFIRM
-        "front_left": {"pwm": 25, "dir": 23},
-        "front_right": {"pwm": 18, "dir": 19},
-        "back_left": {"pwm": 17, "dir": 16},
-        "back_right": {"pwm": 13, "dir": 14},
-        "extra_motor": {"pwm": 4, "dir": 5},
-    },
-}
+# Packed pin table: per config, pwm and dir pin of each motor in MOTOR_NAMES,
+# 0xFF = not connected. Edit host/motor_configs.py and run
+# host/build_configs.py, which also rejects pin conflicts.
+# <generated by host/build_configs.py>
+MOTOR_NAMES = ("front_left", "front_right", "back_left", "back_right",
+               "extra_motor")
+CONFIG_IDS = ("ONE", "TWO", "THREE", "FOUR", "FIVE", "SIX", "SEVEN",
+              "EIGHT", "NINE", "TEN", "ELEVEN", "TWELVE", "THIRTEEN",
+              "FOURTEEN", "FIFTEEN", "SIXTEEN", "SEVENTEEN", "EIGHTEEN",
+              "NINETEEN", "TWENTY", "TWENTYONE", "TWENTYTWO",
+              "TWENTYTHREE", "TWENTYFOUR", "TWENTYFIVE", "TWENTYSIX",
+              "TWENTYSEVEN", "TWENTYEIGHT", "TWENTYNINE", "THIRTY")
+_CONFIG_PINS = (
+    b"\x04\x05\x0d\x0e\x12\x13\x11\x10\x19\x17"  # ONE
+    b"\x12\x13\x17\x19\x10\x11\x0d\x0e\x04\x05"  # TWO
+    b"\x19\x17\x12\x13\x11\x10\x0d\x0e\x04\x05"  # THREE
+    b"\x19\x17\x12\x13\x11\x10\x0d\x0e\x04\x05"  # FOUR
+    b"\x17\x19\x12\x13\x10\x11\x0d\x0e\x04\x05"  # FIVE
+    b"\x17\x19\x13\x12\x10\x11\x0e\x0d\x05\x04"  # SIX
+    b"\x19\x17\x12\x13\x11\x10\x0d\x0e\x04\x05"  # SEVEN
+    b"\x19\x17\x12\x13\x11\x10\x0d\x0e\x04\x05"  # EIGHT
+    b"\x17\x19\x12\x13\x10\x11\x0d\x0e\x04\x05"  # NINE
+    b"\x19\x17\x12\x13\x11\x10\x0d\x0e\x04\x05"  # TEN
+    b"\x19\x17\x13\x12\x11\x10\x0e\x0d\x05\x04"  # ELEVEN
+    b"\x19\x17\x12\x13\x11\x10\x0d\x0e\x04\x05"  # TWELVE
+    b"\x05\x04\x0e\x0d\x11\x10\x13\x12\x19\x17"  # THIRTEEN
+    b"\x05\x04\x0e\x0d\x12\x13\x10\x11\x19\x17"  # FOURTEEN
+    b"\x13\x12\x11\x10\x0d\x0e\x04\x05\x19\xff"  # FIFTEEN
+    b"\x05\x04\x13\x12\x11\x10\x0e\x0d\x17\x19"  # SIXTEEN
+    b"\x12\x13\x17\x19\x0d\x0e\x11\x10\x05\x04"  # SEVENTEEN
+    b"\x0e\x0d\x05\x04\x12\x13\x10\x11\x17\x19"  # EIGHTEEN
+    b"\x12\x13\x17\x19\x0d\x0e\x10\x11\x04\x05"  # NINETEEN
+    b"\x12\x13\x10\x11\x0d\x0e\x04\x05\x17\x19"  # TWENTY
+    b"\x11\x10\x0e\x0d\x19\x17\x13\x12\x04\x05"  # TWENTYONE
+    b"\x12\x13\x11\x10\x0d\x0e\x19\x17\x04\x05"  # TWENTYTWO
+    b"\x19\x17\x13\x12\x11\x10\x0e\x0d\x05\x04"  # TWENTYTHREE
+    b"\x19\x17\x11\x10\x0e\x0d\x13\x12\x05\x04"  # TWENTYFOUR
+    b"\x19\x17\x13\x12\x11\x10\x0e\x0d\x05\x04"  # TWENTYFIVE
+    b"\x19\x17\x13\x12\x11\x10\x0e\x0d\x05\x04"  # TWENTYSIX
+    b"\x19\x17\x13\x12\x11\x10\x0e\x0d\x05\x04"  # TWENTYSEVEN
+    b"\x19\x17\x13\x12\x11\x10\x0e\x0d\x05\x04"  # TWENTYEIGHT
+    b"\x19\x17\x13\x12\x11\x10\x0e\x0d\x05\x04"  # TWENTYNINE
+    b"\x19\x17\x12\x13\x11\x10\x0d\x0e\x04\x05"  # THIRTY
+)
+_ALL_MOTOR_PINS = b"\x04\x05\x0d\x0e\x10\x11\x12\x13\x17\x19"
+# </generated>
+CONFIG_FILE = "motor_config.txt"   # config ID chosen on this board
+
+
+def config_pins(config_id):
+    """
+    The pins of one config as {name: {"pwm": pin, "dir": pin}}, None for
+    a pin that is not connected.
+    """
+    if config_id not in CONFIG_IDS:
+        raise ValueError("Invalid config ID")
+    j = CONFIG_IDS.index(config_id) * 2 * len(MOTOR_NAMES)
+    pins = {}
+    for name in MOTOR_NAMES:
+        pwm = _CONFIG_PINS[j]
+        d = _CONFIG_PINS[j + 1]
+        j += 2
+        if pwm != 0xFF:
+            pins[name] = {"pwm": pwm, "dir": None if d == 0xFF else d}
+    return pins
+
+
+def _load_config_id():
+    try:
+        with open(CONFIG_FILE) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
 
+def _save_config_id(config_id):
+    with open(CONFIG_FILE, "w") as f:
+        f.write(config_id)
 
 # ---------------- Global Motors ----------------
 motors = {}
+_motor_list = ()           # motors.values() as a tuple, iterated without allocating
 _running = False
 _current_motion = None
-
-
-def set_motor_config(config_id):
-    global motors
-    if config_id not in motor_configs:
-        raise ValueError("Invalid config ID")
+_stop_requested = False    # set by STOP, cleared when START is pressed
+_config_id = None
+
+RESET_ON_STOP = False      # True = machine.reset() after STOP instead of resuming
+
+
+def set_motor_config(config_id=None):
+    """
+    Select the board's motor config. The ID is saved to CONFIG_FILE when
+    it changes, so later boots can call set_motor_config() with no ID.
+    """
+    global motors, _motor_list, _config_id
+    saved = _load_config_id()
+    if config_id is None:
+        config_id = saved
+        if config_id is None:
+            raise ValueError("No saved config ID, pass one e.g. \"SIX\"")
+    pins = config_pins(config_id)
+    if config_id != saved:
+        _save_config_id(config_id)
+    _config_id = config_id
 
     _reset_all_pwm_and_dir()
 
     motors = {}
-    for name, pin in motor_configs[config_id].items():
+    for name, pin in pins.items():
         motors[name] = {
             "pwm": PWM(Pin(pin["pwm"]), freq=50),
-            "dir": Pin(pin["dir"], Pin.OUT)
+            "dir": None if pin["dir"] is None else Pin(pin["dir"], Pin.OUT)
         }
         motors[name]["pwm"].duty(0)
-        motors[name]["dir"].value(0)
+        if motors[name]["dir"] is not None:
+            motors[name]["dir"].value(0)
+        motors[name]["last_duty"] = 0
+        motors[name]["last_dir"] = 0
+        motors[name]["target"] = 0
+        motors[name]["target_dir"] = 0
+        motors[name]["lut"] = _load_calibration().get(name)
+    _motor_list = tuple(motors.values())
+
+    _build_motion_table()
+    set_ramp(*RAMP_RATES.get(config_id, DEFAULT_RAMP))
+
+
+# ---------------- Shadow Registers ----------------
+# Each motor dict keeps the last duty and dir written to it ("last_duty",
+# "last_dir"). _set_duty()/_set_dir() only touch the hardware when the value
+# changes. Code that writes m["pwm"]/m["dir"] directly must update these too.
+_write_counts = [0, 0]     # [issued, suppressed]
+
+
+def _set_duty(m, duty):
+    if _stop_requested:
+        duty = 0
+    if m["last_duty"] == duty:
+        _write_counts[1] += 1
+    else:
+        m["pwm"].duty(duty)
+        m["last_duty"] = duty
+        _write_counts[0] += 1
+
+
+def _set_dir(m, value):
+    if m["last_dir"] == value:
+        _write_counts[1] += 1
+    else:
+        if m["dir"] is not None:
+            m["dir"].value(value)
+        m["last_dir"] = value
+        _write_counts[0] += 1
+
+
+def write_stats():
+    return {"issued": _write_counts[0], "suppressed": _write_counts[1]}
+
+
+def reset_write_stats():
+    _write_counts[0] = 0
+    _write_counts[1] = 0
+
+
+# ---------------- Speed Ramping ----------------
+# Acceleration and deceleration in duty units per second, per motor config.
+# 0 means jump straight to the new duty. Example: "SIX": (2000, 4000)
+# reaches full speed in ~0.5 s and stops from full speed in ~0.25 s.
+RAMP_RATES = {
+}
+DEFAULT_RAMP = (0, 0)
+
+RAMP_TIMER_ID = 0
+RAMP_PERIOD_MS = 10
+
+_ramp_timer = None
+_ramp_up = 0        # duty step per tick, 0 = instant
+_ramp_down = 0
+
+
+def set_ramp(accel, decel):
+    """
+    accel/decel: duty units per second (0 = instant). Runs from a hardware
+    timer so FW()/run()/drive() return at once and the duty follows.
+    """
+    global _ramp_timer, _ramp_up, _ramp_down
+    _ramp_up = _ramp_step(accel)
+    _ramp_down = _ramp_step(decel)
+
+    if not (_ramp_up or _ramp_down):
+        if _ramp_timer is not None:
+            _ramp_timer.deinit()
+            _ramp_timer = None
+        for m in _motor_list:       # finish any ramp in progress
+            _set_target(m, m["target_dir"], m["target"])
+        return
+
+    if _ramp_timer is None:
+        _ramp_timer = machine.Timer(RAMP_TIMER_ID)
+        _ramp_timer.init(period=RAMP_PERIOD_MS, mode=machine.Timer.PERIODIC,
+                         callback=_ramp_tick)
+
+
+def _ramp_step(rate):
+    if rate <= 0:
+        return 0
+    return max(1, rate * RAMP_PERIOD_MS // 1000)
+
+
+def _set_target(m, direction, duty):
+    # Duty/dir a motor should end up at. Without ramping they are written
+    # at once; otherwise _ramp_tick() walks the duty there. The target is
+    # kept either way, so set_ramp() can start ramping mid-drive.
+    m["target"] = duty
+    if duty:
+        m["target_dir"] = direction
+    if _ramp_timer is None:
+        if duty:
+            _set_dir(m, direction)
+        _set_duty(m, duty)
+
+
+def _ramp_tick(t):
+    for m in _motor_list:
+        cur = m["last_duty"]
+        tgt = m["target"]
+        if tgt and m["target_dir"] != m["last_dir"]:
+            if cur == 0:
+                _set_dir(m, m["target_dir"])
+            else:
+                tgt = 0         # slow down before reversing
+        if cur < tgt:
+            cur = cur + _ramp_up if _ramp_up and cur + _ramp_up < tgt else tgt
+        elif cur > tgt:
+            cur = cur - _ramp_down if _ramp_down and cur - _ramp_down > tgt else tgt
+        else:
+            continue
+        _set_duty(m, cur)
+
+
+# ---------------- Motor Calibration ----------------
+# Each motor can have its own speed -> duty table (array('H') of 101 entries)
+# starting at the duty where that motor actually begins to turn. Tables are
+# made by calibrate_motors(), stored in CAL_FILE and picked up by
+# set_motor_config(). Motors without a table use the MIN_DUTY rule.
+CAL_FILE = "motor_cal.bin"
+CAL_MOTORS = ("front_left", "front_right", "back_left", "back_right",
+              "extra_motor")
+CAL_STEP = 8          # duty added per step while sweeping
+CAL_STEP_MS = 150
+CAL_POLL_MS = 10      # START/STOP checked this often within a step
+
+_cal_luts = None      # name -> array('H'), loaded once from CAL_FILE
+
+
+def _speed(speed):
+    return int(max(0, min(100, speed)))
+
+
+def _lut_duty(m, speed, duty):
+    # Calibrated duty for speed (0..100) if the motor has a table, else duty
+    lut = m["lut"]
+    return duty if lut is None else lut[speed]
+
+
+def build_lut(start_duty, max_duty=1023):
+    lut = array("H", [0] * 101)
+    for s in range(1, 101):
+        lut[s] = start_duty + (max_duty - start_duty) * (s - 1) // 99
+    return lut
+
+
+def _load_calibration():
+    # File layout: b"ERC1", then 101 uint16 per CAL_MOTORS entry, in order.
+    # An all-zero table means that motor was not calibrated.
+    global _cal_luts
+    if _cal_luts is not None:
+        return _cal_luts
+    _cal_luts = {}
+    try:
+        with open(CAL_FILE, "rb") as f:
+            if f.read(4) != b"ERC1":
+                return _cal_luts
+            for name in CAL_MOTORS:
+                lut = array("H", [0] * 101)
+                if f.readinto(lut) != 202:
+                    break
+                if lut[100]:
+                    _cal_luts[name] = lut
+    except OSError:
+        pass
+    return _cal_luts
+
+
+def _save_calibration(luts):
+    empty = array("H", [0] * 101)
+    with open(CAL_FILE, "wb") as f:
+        f.write(b"ERC1")
+        for name in CAL_MOTORS:
+            f.write(luts.get(name, empty))
+
+
+def calibrate_motors(names=CAL_MOTORS):
+    """
+    Sweep each motor's duty up from 0; press START as soon as the wheel
+    starts turning. Saves the tables and applies them to the active config.
+    A motor whose sweep reaches 1023 without START is left uncalibrated.
+    Press STOP to abort. Returns {name: start_duty}.
+    """
+    # The ramp timer would pull the swept duty back to the target (0)
+    ramp = (_ramp_up * 1000 // RAMP_PERIOD_MS, _ramp_down * 1000 // RAMP_PERIOD_MS)
+    set_ramp(0, 0)
+    try:
+        return _calibrate_motors(names)
+    finally:
+        set_ramp(*ramp)
+
+
+def _calibrate_motors(names):
+    luts = dict(_load_calibration())
+    found = {}
+    for name in names:
+        if name not in motors:
+            continue
+        m = motors[name]
+        oled_status("CALIBRATE", name, "Press START when", "wheel turns")
+        while button_start.value() == 1:
+            time.sleep_ms(20)
+
+        _set_dir(m, 0)
+        duty = 0
+        pressed = False
+        while duty < 1023 and not pressed:
+            duty = min(1023, duty + CAL_STEP)
+            _set_duty(m, duty)
+            for _ in range(CAL_STEP_MS // CAL_POLL_MS):
+                time.sleep_ms(CAL_POLL_MS)
+                if _stop_requested or button_stop.value() == 0:
+                    stop_all(force=True)
+                    oled_status("CALIBRATE", "aborted")
+                    return found
+                if button_start.value() == 1:
+                    pressed = True
+                    break
+        _set_duty(m, 0)
+
+        if not pressed:
+            print("No START press for", name, "- not calibrated")
+            oled_status("CALIBRATE", name, "no START press", "skipped")
+            time.sleep_ms(1000)
+            continue
+        found[name] = duty
+        luts[name] = build_lut(duty)
+        m["lut"] = luts[name]
+        print("Calibrated", name, "start duty", duty)
+        time.sleep_ms(500)
+
+    if found:
+        _save_calibration(luts)
+        _cal_luts.update(luts)
+        oled_status("CALIBRATE", "saved", "", "")
+    return found
 
 
 # ---------------- Motor Functions ----------------
+def _motor_duty(m, speed):
+    speed = _speed(speed)
+    return _lut_duty(m, speed, speed * 1023 // 100)
+
+
 def run_motor(name, speed, duration, direction=1):
     check_stop()
     if name in motors:
-        motors[name]["dir"].value(direction)
-        duty = int(max(0, min(100, speed)) * 1023 // 100)
-        motors[name]["pwm"].duty(duty)
+        _set_target(motors[name], direction, _motor_duty(motors[name], speed))
         wait(duration)
-        motors[name]["pwm"].duty(0)
+        _set_target(motors[name], direction, 0)
 
 
 def stop_motor(name):
     if name in motors:
-        motors[name]["pwm"].duty(0)
+        _set_target(motors[name], 0, 0)
 
 
-def stop_all():
-    for m in motors:
+def stop_all(force=False):
+    # Immediate, never ramped. force=True writes every duty even if the
+    # shadow says it is already 0.
+    for m in _motor_list:
         try:
-            motors[m]["pwm"].duty(0)
+            m["target"] = 0
+            if force:
+                m["pwm"].duty(0)
+                m["last_duty"] = 0
+            else:
+                _set_duty(m, 0)
         except:
             pass
 
@@ -390,64 +771,246 @@ led_warning = Pin(2, Pin.OUT)
 buzzer_pin = Pin(15, Pin.OUT)
 
 
+# STOP zeroes the motors from its IRQ the moment it is pressed, even while
+# the main loop is busy elsewhere. The halt/restart flow still runs
+# from the main context, the next time check_stop() is called.
+def _stop_irq(pin):
+    global _stop_requested
+    _stop_requested = True
+    stop_all(force=True)
+
+
+button_stop.irq(trigger=Pin.IRQ_FALLING, handler=_stop_irq)
+
+
 def wait_for_start():
-    global _running
     print("Waiting for START button (D34)...")
     while button_start.value() == 0:
         wait(0.01)
     print("START pressed!")
+    _resume()
+
+
+def _resume():
+    global _running, _stop_requested
+    if _stop_requested:
+        _stop_requested = False
+        led_warning.value(0)
     _running = True
 
 
-def check_stop():
-    global _running
+def _soft_recover():
+    global _running, _current_motion
+    # Fresh PWM/dir state for the active config; motors stay at zero
+    # (_stop_requested is still set) until wait_for_start() sees START.
+    if _config_id is not None:
+        set_motor_config(_config_id)
+    else:
+        _reset_all_pwm_and_dir()
+    buzzer_pin.value(0)
+    _running = False
+    _current_motion = None
 
-    if button_stop.value() == 0:
-        stop_all()
-        _running = False
 
-        print("EMERGENCY STOP! System halted.")
-        oled_status("SYSTEM STOPPED", "Press START", "", "")
-        led_warning.value(1)
+def check_stop():
+    if _stop_requested and not _running:
+        return      # already halted, waiting for wait_for_start()
+
+    if _stop_requested or button_stop.value() == 0:
+        _halt()
 
         # Wait until STOP released
         while button_stop.value() == 0:
             time.sleep(0.05)
 
+        if not RESET_ON_STOP:
+            # Every motion call is a no-op until the program gets back to
+            # wait_for_start(), which resumes on the next START press.
+            _soft_recover()
+            print("Stopped. Press START to resume.")
+            return
+
         # Wait for START press
         while button_start.value() == 0:
             time.sleep(0.05)
 
-        print("Restarting system...")
-        led_warning.value(0)
-        time.sleep(0.2)
+        _restart()
+
+
+# The two ends of the halt flow, shared with motor_async.check_stop()
+def _halt():
+    global _running, _stop_requested
+    _stop_requested = True
+    stop_all(force=True)
+    _running = False
+
+    print("EMERGENCY STOP! System halted.")
+    stop_pattern()
+    oled_status("SYSTEM STOPPED", "Press START", "", "")
+    led_warning.value(1)
+
+
+def _restart():
+    global _stop_requested
+    print("Restarting system...")
+    _stop_requested = False
+    led_warning.value(0)
+    time.sleep(0.2)
+    oled_flush()
 
-        machine.reset()   # 🔁 FULL RESTART
+    machine.reset()   # 🔁 FULL RESTART
 
         
 def led_on():
+    stop_pattern(led_warning)
     led_warning.value(1)
 
 def led_off():
+    stop_pattern(led_warning)
     led_warning.value(0)
     
 def buzz(duration, times):
+    # Returns at once; the beeps play from the pattern timer
     if times <= 0 or duration <= 0:
         return
 
-    interval = duration / (times * 2)  # ON + OFF cycles
-
-    for _ in range(times):
-        buzzer_pin.value(1)
-        time.sleep(interval)
-        buzzer_pin.value(0)
-        time.sleep(interval)
+    interval = int(duration * 1000 / (times * 2))  # ON + OFF cycles, ms
+    play_pattern(buzzer_pin, (interval, interval), times)
+
+
+# ---------------- Patterns ----------------
+# On/off sequences for buzzer_pin, led_warning or any output Pin, stepped
+# from a hardware timer so they play while the robot drives. The timer
+# only runs while a pattern is playing.
+PATTERN_TIMER_ID = 3
+PATTERN_TICK_MS = 10
+
+_pattern_timer = None
+_patterns = []      # [pin, ticks per step, step, ticks left, repeats left]
+
+
+def play_pattern(pin, pattern, repeat=1):
+    """
+    pattern: on/off times in ms, starting with on, e.g. (100, 100, 300, 700).
+    It must have an even length so that every on time has its off time;
+    ValueError otherwise. repeat: times to play it, 0 = until stop_pattern().
+    Replaces any pattern already playing on pin and returns at once.
+    """
+    global _pattern_timer
+    if len(pattern) & 1:
+        raise ValueError("pattern needs an off time after every on time")
+    stop_pattern(pin)
+    if not pattern:
+        return
+    ticks = [max(1, (ms + PATTERN_TICK_MS // 2) // PATTERN_TICK_MS)
+             for ms in pattern]
+    state = machine.disable_irq()
+    _patterns.append([pin, ticks, 0, ticks[0], repeat])
+    pin.value(1)
+    machine.enable_irq(state)
+    if _pattern_timer is None:
+        _pattern_timer = machine.Timer(PATTERN_TIMER_ID)
+        _pattern_timer.init(period=PATTERN_TICK_MS,
+                            mode=machine.Timer.PERIODIC,
+                            callback=_pattern_tick)
+
+
+def stop_pattern(pin=None):
+    # Stop the pattern on pin (every pattern if None) and leave it off.
+    # IRQs are off so _pattern_tick() cannot pop entries under the loop.
+    state = machine.disable_irq()
+    i = len(_patterns)
+    while i:
+        i -= 1
+        p = _patterns[i]
+        if pin is None or p[0] is pin:
+            _patterns.pop(i)
+            p[0].value(0)
+    machine.enable_irq(state)
+
+
+def pattern_playing(pin=None):
+    for p in _patterns:
+        if pin is None or p[0] is pin:
+            return True
+    return False
+
+
+def _pattern_tick(t):
+    global _pattern_timer
+    i = len(_patterns)
+    while i:
+        i -= 1
+        p = _patterns[i]
+        p[3] -= 1
+        if p[3] > 0:
+            continue
+        step = p[2] + 1
+        if step == len(p[1]):
+            step = 0
+            if p[4]:
+                p[4] -= 1
+                if not p[4]:
+                    _patterns.pop(i)
+                    p[0].value(0)
+                    continue
+        p[2] = step
+        p[3] = p[1][step]
+        p[0].value(0 if step & 1 else 1)
+    if not _patterns and _pattern_timer is not None:
+        _pattern_timer.deinit()
+        _pattern_timer = None
 
 
 def is_running():
     return _running
 
 
+# ---------------- Motion Table ----------------
+# One row per motion: direction bit for each wheel and which wheels get duty.
+# Wheel order is WHEELS. Undriven wheels keep their direction and get duty 0.
+WHEELS = ("front_left", "front_right", "back_left", "back_right")
+
+MOTION_TABLE = {
+    #        FL FR BL BR        FL FR BL BR
+    "FW":  ((0, 1, 0, 1),     (1, 1, 1, 1)),
+    "BW":  ((1, 0, 1, 0),     (1, 1, 1, 1)),
+    "L":   ((1, 1, 0, 0),     (1, 1, 1, 1)),   # Strafe Left
+    "R":   ((0, 0, 1, 1),     (1, 1, 1, 1)),   # Strafe Right
+    "CCW": ((1, 1, 1, 1),     (1, 1, 1, 1)),
+    "CW":  ((0, 0, 0, 0),     (1, 1, 1, 1)),
+    "FL":  ((0, 1, 0, 0),     (0, 1, 1, 0)),   # Forward Left Diagonal
+    "FR":  ((0, 0, 0, 1),     (1, 0, 0, 1)),   # Forward Right Diagonal
+    "BL":  ((1, 0, 0, 0),     (1, 0, 0, 1)),   # Backward Left Diagonal
+    "BR":  ((0, 0, 1, 0),     (0, 1, 1, 0)),   # Backward Right Diagonal
+}
+
+# motion -> ((motor, dir_bit, driven), ...) for the active config
+_motion_steps = {}
+# ((motor, forward_dir_bit), ...) in WHEELS order, used by drive()
+_drive_wheels = ()
+
+
+def _build_motion_table():
+    global _motion_steps, _drive_wheels
+    _motion_steps = {}
+    for motion, (dirs, mask) in MOTION_TABLE.items():
+        _motion_steps[motion] = tuple(
+            (motors[w], dirs[i], mask[i]) for i, w in enumerate(WHEELS)
+        )
+    fw = MOTION_TABLE["FW"][0]
+    _drive_wheels = tuple((motors[w], fw[i]) for i, w in enumerate(WHEELS))
+
+
+def _apply_motion(motion, speed, duty):
+    # duty is used for motors without a calibration table
+    for m, bit, driven in _motion_steps[motion]:
+        if driven:
+            _set_target(m, bit, _lut_duty(m, speed, duty))
+        else:
+            _set_target(m, bit, 0)
+
+
 # ---------------- Movements ----------------
 def movement(motion, speed=100, duration=1.5, direction=1):
     global _running
@@ -456,106 +1019,45 @@ def movement(motion, speed=100, duration=1.5, direction=1):
         stop_all()
         return
 
-    duty = int(max(0, min(100, speed)) * 1023 // 100)
-
-    if motion == "FW":
-        motors["front_left"]["dir"].value(0)
-        motors["front_right"]["dir"].value(1)
-        motors["back_left"]["dir"].value(0)
-        motors["back_right"]["dir"].value(1)
-
-    elif motion == "BW":
-        motors["front_left"]["dir"].value(1)
-        motors["front_right"]["dir"].value(0)
-        motors["back_left"]["dir"].value(1)
-        motors["back_right"]["dir"].value(0)
-        
-    elif motion == "L":  # Strafe Left
-        motors["front_left"]["dir"].value(1)
-        motors["front_right"]["dir"].value(1)
-        motors["back_left"]["dir"].value(0)
-        motors["back_right"]["dir"].value(0)
-
-    elif motion == "R":  # Strafe Right
-        motors["front_left"]["dir"].value(0)
-        motors["front_right"]["dir"].value(0)
-        motors["back_left"]["dir"].value(1)
-        motors["back_right"]["dir"].value(1)
-
-    elif motion == "FL":  # Forward Left Diagonal
-        motors["front_right"]["dir"].value(1)
-        motors["back_left"]["dir"].value(0)
-        motors["front_left"]["pwm"].duty(0)
-        motors["back_right"]["pwm"].duty(0)
-
-    elif motion == "FR":  # Forward Right Diagonal
-        motors["front_left"]["dir"].value(0)
-        motors["back_right"]["dir"].value(1)
-        motors["front_right"]["pwm"].duty(0)
-        motors["back_left"]["pwm"].duty(0)
-
-    elif motion == "BL":  # Backward Left Diagonal
-        motors["front_right"]["dir"].value(0)
-        motors["back_left"]["dir"].value(1)
-        motors["front_left"]["pwm"].duty(0)
-        motors["back_right"]["pwm"].duty(0)
-
-    elif motion == "BR":  # Backward Right Diagonal
-        motors["front_left"]["dir"].value(1)
-        motors["back_right"]["dir"].value(0)
-        motors["front_right"]["pwm"].duty(0)
-        motors["back_left"]["pwm"].duty(0)
-
-    elif motion == "CCW":
-        for m in motors:
-            motors[m]["dir"].value(1)
-
-    elif motion == "CW":
-        for m in motors:
-            motors[m]["dir"].value(0)
-
-    elif motion in motors:
-        motors[motion]["dir"].value(direction)
-
-    else:
+    deadline = _deadline(duration)
+    if motion not in _motion_steps and motion not in motors:
         print("Unknown motion:", motion)
         return
 
-    elapsed = 0
-    interval = 0.05
-    while elapsed < duration:
-        check_stop()
-        if not _running:
-            stop_all()
-            return
-
-        if motion in motors:
-            motors[motion]["pwm"].duty(duty)
-        else:
-            for m in motors:
-                if m != "extra_motor":
-                    motors[m]["pwm"].duty(duty)
+    check_stop()
+    if not _running:
+        stop_all()
+        return
 
-        time.sleep(interval)
-        elapsed += interval
+    if time.ticks_diff(deadline, time.ticks_us()) > 0:
+        _start_motion(motion, speed, direction)
+        _wait_until(deadline)
 
     stop_all()
+
+
+def _start_motion(motion, speed, direction):
+    # motion: a MOTION_TABLE entry or a single motor name
+    if motion in _motion_steps:
+        speed = _speed(speed)
+        _apply_motion(motion, speed, speed * 1023 // 100)
+    else:
+        m = motors[motion]
+        _set_target(m, direction, _motor_duty(m, speed))
     
     # ---------------- NON-BLOCKING MOTOR CONTROL ----------------
 def run(name, speed=100, direction=1):
     check_stop()
     if name in motors:
-        motors[name]["dir"].value(direction)
-        duty = int(max(0, min(100, speed)) * 1023 // 100)
-        motors[name]["pwm"].duty(duty)
+        _set_target(motors[name], direction, _motor_duty(motors[name], speed))
 
 def stop(name):
     if name in motors:
-        motors[name]["pwm"].duty(0)
+        _set_target(motors[name], 0, 0)
         
 # ================= NON-BLOCKING MOVEMENTS =================
 
-MIN_DUTY = 520   # tune between 200–350 depending on motors
+MIN_DUTY = 520   # lowest duty for uncalibrated motors, see calibrate_motors()
 
 def _calc_duty(speed):
     speed = max(0, min(100, speed))
@@ -565,190 +1067,585 @@ def _calc_duty(speed):
     return max(duty, MIN_DUTY)
 
 
-def FW(speed=100):
+def _drive(motion, speed):
     global _current_motion
     check_stop()
     if not _running:
         stop_all(); return
-    _current_motion = "FW" 
-    duty = _calc_duty(speed)
+    _current_motion = motion
+    speed = _speed(speed)
+    _apply_motion(motion, speed, _calc_duty(speed))
 
-    motors["front_left"]["dir"].value(0)
-    motors["front_right"]["dir"].value(1)
-    motors["back_left"]["dir"].value(0)
-    motors["back_right"]["dir"].value(1)
 
-    for m in ["front_left","front_right","back_left","back_right"]:
-        motors[m]["pwm"].duty(duty)
+def FW(speed=100):
+    _drive("FW", speed)
 
 
 def BW(speed=100):
-    global _current_motion
-    check_stop()
-    if not _running:
-        stop_all(); return
-    _current_motion = "BW" 
-    duty = _calc_duty(speed)
-
-    motors["front_left"]["dir"].value(1)
-    motors["front_right"]["dir"].value(0)
-    motors["back_left"]["dir"].value(1)
-    motors["back_right"]["dir"].value(0)
-
-    for m in ["front_left","front_right","back_left","back_right"]:
-        motors[m]["pwm"].duty(duty)
+    _drive("BW", speed)
 
 
 def L(speed=100):
-    global _current_motion
-    check_stop()
-    if not _running:
-        stop_all(); return
-    _current_motion = "L" 
-    duty = _calc_duty(speed)
-
-    motors["front_left"]["dir"].value(1)
-    motors["front_right"]["dir"].value(1)
-    motors["back_left"]["dir"].value(0)
-    motors["back_right"]["dir"].value(0)
-
-    for m in ["front_left","front_right","back_left","back_right"]:
-        motors[m]["pwm"].duty(duty)
+    _drive("L", speed)
 
 
 def R(speed=100):
-    global _current_motion
-    check_stop()
-    if not _running:
-        stop_all(); return
-    _current_motion = "R" 
-    duty = _calc_duty(speed)
-
-    motors["front_left"]["dir"].value(0)
-    motors["front_right"]["dir"].value(0)
-    motors["back_left"]["dir"].value(1)
-    motors["back_right"]["dir"].value(1)
-
-    for m in ["front_left","front_right","back_left","back_right"]:
-        motors[m]["pwm"].duty(duty)
+    _drive("R", speed)
 
 
 def CCW(speed=100):
-    global _current_motion
-    check_stop()
-    if not _running:
-        stop_all(); return
-    _current_motion = "CCW" 
-    duty = _calc_duty(speed)
-
-    for m in ["front_left","front_right","back_left","back_right"]:
-        motors[m]["dir"].value(1)
-        motors[m]["pwm"].duty(duty)
+    _drive("CCW", speed)
 
 
 def CW(speed=100):
-    global _current_motion
-    check_stop()
-    if not _running:
-        stop_all(); return
-    _current_motion = "CW" 
-    duty = _calc_duty(speed)
-
-    for m in ["front_left","front_right","back_left","back_right"]:
-        motors[m]["dir"].value(0)
-        motors[m]["pwm"].duty(duty)
+    _drive("CW", speed)
 
 
 def FL(speed=100):  # Forward Left
-    global _current_motion
-    check_stop()
-    if not _running:
-        stop_all(); return
-    _current_motion = "FL" 
-    duty = _calc_duty(speed)
-
-    motors["front_right"]["dir"].value(1)
-    motors["back_left"]["dir"].value(0)
-
-    motors["front_right"]["pwm"].duty(duty)
-    motors["back_left"]["pwm"].duty(duty)
-    motors["front_left"]["pwm"].duty(0)
-    motors["back_right"]["pwm"].duty(0)
+    _drive("FL", speed)
 
 
 def FR(speed=100):  # Forward Right
-    global _current_motion
-    check_stop()
-    if not _running:
-        stop_all(); return
-    _current_motion = "FR" 
-    duty = _calc_duty(speed)
+    _drive("FR", speed)
+
 
-    motors["front_left"]["dir"].value(0)
-    motors["back_right"]["dir"].value(1)
+def BL(speed=100):  # Backward Left
+    _drive("BL", speed)
 
-    motors["front_left"]["pwm"].duty(duty)
-    motors["back_right"]["pwm"].duty(duty)
-    motors["front_right"]["pwm"].duty(0)
-    motors["back_left"]["pwm"].duty(0)
 
+def BR(speed=100):  # Backward Right
+    _drive("BR", speed)
 
-def BR(speed=100):  # Backward Left
+# ---------------- Vector Drive ----------------
+def drive(vx, vy=0, omega=0):
+    """
+    Mecanum drive: vx forward, vy strafe left, omega turn CCW (-100..100).
+    If any wheel would need more than 100 all four are scaled down together.
+    """
     global _current_motion
     check_stop()
     if not _running:
         stop_all(); return
-    _current_motion = "BR" 
-    duty = _calc_duty(speed)
+    _current_motion = "DRIVE"
 
-    motors["front_right"]["dir"].value(0)
-    motors["back_left"]["dir"].value(1)
+    vx = int(vx); vy = int(vy); omega = int(omega)
+    fl = vx - vy - omega
+    fr = vx + vy + omega
+    bl = vx + vy - omega
+    br = vx - vy + omega
 
-    motors["front_right"]["pwm"].duty(duty)
-    motors["back_left"]["pwm"].duty(duty)
-    motors["front_left"]["pwm"].duty(0)
-    motors["back_right"]["pwm"].duty(0)
+    peak = max(abs(fl), abs(fr), abs(bl), abs(br))
+    if peak < 100:
+        peak = 100
 
+    w = _drive_wheels
+    _drive_wheel(w[0], fl, peak)
+    _drive_wheel(w[1], fr, peak)
+    _drive_wheel(w[2], bl, peak)
+    _drive_wheel(w[3], br, peak)
 
-def BL(speed=100):  # Backward Right
-    global _current_motion
-    check_stop()
-    if not _running:
-        stop_all(); return
-    _current_motion = "BL" 
-    duty = _calc_duty(speed)
 
-    motors["front_left"]["dir"].value(1)
-    motors["back_right"]["dir"].value(0)
+def _drive_wheel(wheel, v, peak):
+    m, fwd = wheel
+    if v < 0:
+        fwd = 1 - fwd
+        v = -v
+    v = v * 100 // peak
+    _set_target(m, fwd, _lut_duty(m, v, _calc_duty(v)))
+
 
-    motors["front_left"]["pwm"].duty(duty)
-    motors["back_right"]["pwm"].duty(duty)
-    motors["front_right"]["pwm"].duty(0)
-    motors["back_left"]["pwm"].duty(0)
-    
 def stop_drive(motion=None):
+    # Decelerates at the config's ramp rate; stop_all() is always immediate.
     global _current_motion
-    stop_all()
+    if _ramp_timer is None:
+        stop_all()
+    else:
+        for m in _motor_list:
+            _set_target(m, 0, 0)
     _current_motion = None
 
-def sensor_1():
-    if _adc1.read() > THRESHOLD:
-        return 1 
+# ---------------- Sensors ----------------
+# Each sensor turns on above threshold + hysteresis and off at or below
+# threshold - hysteresis, so noise around the threshold does not chatter.
+SENSOR_THRESHOLDS = [THRESHOLD, THRESHOLD, THRESHOLD]
+SENSOR_HYSTERESIS = [100, 100, 100]
+SENSOR_SAMPLES = 1         # ADC reads per sensor per call, see configure_sensors()
+SENSOR_FILTER = "median"   # or "mean", used when SENSOR_SAMPLES > 1
+
+_adcs = None               # ADCs, created on the first read by _sensor_init()
+_sensor_raw = [0, 0, 0]    # last filtered reading, updated in place
+_sensor_reading = [0, _sensor_raw]     # read_sensors() result, reused
+_sensor_mask = 0           # bit 0 = sensor_1, bit 1 = sensor_2, bit 2 = sensor_3
+_sensor_on = [0, 0, 0]
+_sensor_off = [0, 0, 0]
+_sample_bufs = ()
+_sensor_median = True
+
+
+def configure_sensors(samples=None, filter=None, thresholds=None,
+                      hysteresis=None):
+    global SENSOR_SAMPLES, SENSOR_FILTER, _sample_bufs, _sensor_median
+    if samples is not None:
+        SENSOR_SAMPLES = max(1, int(samples))
+    if filter is not None:
+        if filter not in ("median", "mean"):
+            raise ValueError("filter must be 'median' or 'mean'")
+        SENSOR_FILTER = filter
+    if thresholds is not None:
+        SENSOR_THRESHOLDS[:] = thresholds
+    if hysteresis is not None:
+        SENSOR_HYSTERESIS[:] = hysteresis
+
+    for i in range(3):
+        _sensor_on[i] = SENSOR_THRESHOLDS[i] + SENSOR_HYSTERESIS[i]
+        _sensor_off[i] = SENSOR_THRESHOLDS[i] - SENSOR_HYSTERESIS[i]
+    _sample_bufs = tuple([0] * SENSOR_SAMPLES for _ in range(3))
+    _sensor_median = SENSOR_FILTER == "median"
+
+
+def _sensor_init():
+    global _adcs
+    _adcs = (ADC(Pin(39)), ADC(Pin(36)), ADC(Pin(35)))   # VN, VP, D35
+    for a in _adcs:
+        a.atten(ADC.ATTN_11DB)
+        a.width(ADC.WIDTH_12BIT)
+
+
+def _read_sensor(i):
+    global _sensor_mask
+    if _adcs is None:
+        _sensor_init()
+    adc = _adcs[i]
+    n = SENSOR_SAMPLES
+    if n == 1:
+        v = adc.read()
     else:
-        return 0
+        buf = _sample_bufs[i]
+        for k in range(n):
+            buf[k] = adc.read()
+        if _sensor_median:
+            buf.sort()
+            v = buf[n >> 1]
+        else:
+            v = sum(buf) // n
+    _sensor_raw[i] = v
+
+    bit = 1 << i
+    if _sensor_mask & bit:
+        if v <= _sensor_off[i]:
+            _sensor_mask &= ~bit
+    elif v > _sensor_on[i]:
+        _sensor_mask |= bit
+    return _sensor_mask & bit
+
+
+def read_sensors():
+    """
+    Sample all three sensors. Returns [mask, raw]: mask has bit 0..2 set for
+    sensor_1..3 on the line, raw is [v1, v2, v3]. Both lists are reused on
+    every call, so unpack them (mask, raw = read_sensors()) rather than
+    keep them. While the background sampler runs this returns its latest
+    reading.
+    """
+    if not _sampling:
+        _read_sensor(0)
+        _read_sensor(1)
+        _read_sensor(2)
+    _sensor_reading[0] = _sensor_mask
+    return _sensor_reading
+
+
+def sensor_1():
+    if not _sampling:
+        _read_sensor(0)
+    return _sensor_mask & 1
+
 
 def sensor_2():
-    if _adc2.read() > THRESHOLD:
-        return 1
-    else:
-        return 0
+    if not _sampling:
+        _read_sensor(1)
+    return (_sensor_mask >> 1) & 1
+
 
 def sensor_3():
-    if _adc3.read() > THRESHOLD:
-        return 1
-    else:
-        return 0
+    if not _sampling:
+        _read_sensor(2)
+    return (_sensor_mask >> 2) & 1
 
 
+# ---------------- Sensor Calibration ----------------
+# Per-sensor thresholds and hysteresis measured on the actual arena, kept in
+# SENSOR_CAL_FILE and applied once at import. Without the file THRESHOLD is
+# used for every sensor.
+SENSOR_CAL_FILE = "sensor_cal.bin"
+SENSOR_CAL_BAND = 15      # hysteresis, % of the light-to-dark span
+SENSOR_CAL_MIN_SPAN = 200 # ignore sensors that never saw both surfaces
 
 
+def _load_sensor_cal():
+    # File layout: b"ERS1", then threshold, hysteresis (uint16) per sensor
+    cal = array("H", [0] * 6)
+    try:
+        with open(SENSOR_CAL_FILE, "rb") as f:
+            if f.read(4) == b"ERS1" and f.readinto(cal) == 12:
+                configure_sensors(thresholds=[cal[0], cal[2], cal[4]],
+                                  hysteresis=[cal[1], cal[3], cal[5]])
+                return True
+    except OSError:
+        pass
+    configure_sensors()
+    return False
+
+
+def _save_sensor_cal():
+    cal = array("H", [0] * 6)
+    for i in range(3):
+        cal[2 * i] = SENSOR_THRESHOLDS[i]
+        cal[2 * i + 1] = SENSOR_HYSTERESIS[i]
+    with open(SENSOR_CAL_FILE, "wb") as f:
+        f.write(b"ERS1")
+        f.write(cal)
+
+
+def _apply_sensor_range(lo, hi, save):
+    # lo/hi: lowest and highest reading seen per sensor
+    thresholds = list(SENSOR_THRESHOLDS)
+    hysteresis = list(SENSOR_HYSTERESIS)
+    for i in range(3):
+        span = hi[i] - lo[i]
+        if span < SENSOR_CAL_MIN_SPAN:
+            print("sensor_%d: range too small (%d), kept old threshold" % (i + 1, span))
+            continue
+        thresholds[i] = lo[i] + span // 2
+        hysteresis[i] = span * SENSOR_CAL_BAND // 100
+    configure_sensors(thresholds=thresholds, hysteresis=hysteresis)
+    if save:
+        _save_sensor_cal()
+    print("Sensor thresholds", SENSOR_THRESHOLDS, "hysteresis", SENSOR_HYSTERESIS)
+    return thresholds
+
+
+def _average_sensors(samples):
+    if _adcs is None:
+        _sensor_init()
+    total = [0, 0, 0]
+    for _ in range(samples):
+        for i in range(3):
+            total[i] += _adcs[i].read()
+        time.sleep_ms(2)
+    return [t // samples for t in total]
+
+
+def calibrate_sensors(samples=64, save=True):
+    """
+    Guided calibration: put all three sensors over the floor and press
+    START, then over the line and press START again.
+    """
+    readings = []
+    for surface in ("FLOOR", "LINE"):
+        oled_status("SENSOR CAL", "Sensors over", surface, "then press START")
+        while button_start.value() == 1:
+            time.sleep_ms(20)
+        while button_start.value() == 0:
+            time.sleep_ms(20)
+        readings.append(_average_sensors(samples))
+    lo = [min(a, b) for a, b in zip(readings[0], readings[1])]
+    hi = [max(a, b) for a, b in zip(readings[0], readings[1])]
+    oled_status("SENSOR CAL", "done", "", "")
+    return _apply_sensor_range(lo, hi, save)
+
+
+def autocal_sensors(duration=2.0, turn=35, save=True):
+    """
+    On-the-fly calibration: spins in place (turn = drive() omega, 0 to push
+    the robot by hand) for duration seconds while recording the lowest and
+    highest reading of each sensor, so start it next to the line. With turn
+    it must run after wait_for_start(), since drive() does nothing before.
+    Returns the new thresholds, or None (nothing applied or saved) if it
+    could not run or STOP cut the spin short.
+    """
+    if turn and not _running:
+        print("autocal_sensors: not running, call it after wait_for_start()")
+        return None
+    if _adcs is None:
+        _sensor_init()
+    lo = [4095, 4095, 4095]
+    hi = [0, 0, 0]
+    n = 0
+    end = _deadline(duration)
+    if turn:
+        drive(0, 0, turn)
+    while time.ticks_diff(end, time.ticks_us()) > 0:
+        check_stop()
+        if turn and not _running:
+            break
+        n += 1
+        for i in range(3):
+            v = _adcs[i].read()
+            if v < lo[i]:
+                lo[i] = v
+            if v > hi[i]:
+                hi[i] = v
+        time.sleep_ms(2)
+    if turn:
+        stop_drive()
+    if not n or (turn and not _running):
+        print("autocal_sensors: stopped before the spin finished, nothing saved")
+        return None
+    return _apply_sensor_range(lo, hi, save)
+
+
+_load_sensor_cal()
+
+
+# ---------------- Background Sampler ----------------
+# Samples all three sensors from a hardware timer at a fixed rate into a
+# ring buffer, and calls edge callbacks when a sensor changes state. While
+# it runs, sensor_N()/read_sensors() return the latest sample without
+# touching the ADC.
+SAMPLER_TIMER_ID = 1
+
+_sampler_timer = None
+_sampling = False
+_ring = array("H")          # 3 values per sample, oldest overwritten
+_ring_len = 0               # capacity in samples
+_ring_head = 0              # next slot to write
+_ring_unread = 0
+_ring_dropped = 0           # unread samples overwritten before drain
+_edge_rising = [None, None, None]
+_edge_falling = [None, None, None]
+
+
+def start_sampler(rate_hz=500, history=64, timer=True):
+    """
+    timer=False sets up the ring buffer but starts no timer; the caller
+    runs _sample_tick() at rate_hz instead (see motor_async.sampler()).
+    """
+    global _sampler_timer, _ring, _ring_len, _ring_head, _ring_unread
+    global _ring_dropped, _sampling
+    stop_sampler()
+    _ring = array("H", [0] * (3 * history))
+    _ring_len = history
+    _ring_head = 0
+    _ring_unread = 0
+    _ring_dropped = 0
+    _sampling = True
+    if timer:
+        _sampler_timer = machine.Timer(SAMPLER_TIMER_ID)
+        _sampler_timer.init(freq=rate_hz, mode=machine.Timer.PERIODIC,
+                            callback=_sample_tick)
+
+
+def stop_sampler():
+    global _sampler_timer, _sampling
+    _sampling = False
+    if _sampler_timer is not None:
+        _sampler_timer.deinit()
+        _sampler_timer = None
+
+
+def on_edge(sensor, rising=None, falling=None):
+    """
+    sensor: 1..3. rising(sensor)/falling(sensor) run from the sampler timer
+    when the sensor turns on/off; keep them short. None clears a callback.
+    """
+    _edge_rising[sensor - 1] = rising
+    _edge_falling[sensor - 1] = falling
+
+
+def _sample_tick(t):
+    global _ring_head, _ring_unread, _ring_dropped
+    before = _sensor_mask
+    _read_sensor(0)
+    _read_sensor(1)
+    _read_sensor(2)
+
+    j = _ring_head * 3
+    _ring[j] = _sensor_raw[0]
+    _ring[j + 1] = _sensor_raw[1]
+    _ring[j + 2] = _sensor_raw[2]
+    _ring_head = _ring_head + 1 if _ring_head + 1 < _ring_len else 0
+    if _ring_unread < _ring_len:
+        _ring_unread += 1
+    else:
+        _ring_dropped += 1
+
+    changed = before ^ _sensor_mask
+    if changed:
+        for i in range(3):
+            if changed & (1 << i):
+                cb = _edge_rising[i] if _sensor_mask & (1 << i) else _edge_falling[i]
+                if cb is not None:
+                    cb(i + 1)
+
+
+def drain_samples(out=None):
+    """
+    Unread samples, oldest first. With out (array/list of 3 * history) the
+    values are copied into it as v1, v2, v3, v1, ... and the sample count is
+    returned; otherwise a list of (v1, v2, v3) tuples is returned.
+    """
+    global _ring_unread
+    state = machine.disable_irq()
+    n = _ring_unread
+    start = _ring_head - n
+    _ring_unread = 0
+    machine.enable_irq(state)
+    if start < 0:
+        start += _ring_len
+
+    result = [] if out is None else n
+    for k in range(n):
+        j = (start + k) % _ring_len * 3
+        if out is None:
+            result.append((_ring[j], _ring[j + 1], _ring[j + 2]))
+        else:
+            out[k * 3] = _ring[j]
+            out[k * 3 + 1] = _ring[j + 1]
+            out[k * 3 + 2] = _ring[j + 2]
+    return result
+
+
+def sampler_dropped():
+    return _ring_dropped
+
+
+# ---------------- Profiling ----------------
+# profile(True) swaps the PROFILE_NAMES functions in this module for timed
+# wrappers; profile(False) puts the originals back, so there is no cost
+# while it is off. Calls inside the library go through the wrappers too,
+# and times include nested calls (wait() includes its check_stop() calls).
+# A star import copies the functions, so turn profiling on first:
+#
+#     import motor_library
+#     motor_library.profile(True)
+#     from motor_library import *
+#
+# Call loop_tick() once per control loop iteration to get the loop rate.
+PROFILE_NAMES = ("check_stop", "FW", "BW", "L", "R", "CCW", "CW", "FL", "FR",
+                 "BL", "BR", "drive", "movement", "wait", "oled_status",
+                 "sensor_1", "sensor_2", "sensor_3", "read_sensors")
+# show_stats() labels, in PROFILE_NAMES order, 4 characters at most
+PROFILE_LABELS = ("chk", "FW", "BW", "L", "R", "CCW", "CW", "FL", "FR",
+                  "BL", "BR", "drv", "move", "wait", "oled",
+                  "s1", "s2", "s3", "rsen")
+
+_prof_calls = [0] * len(PROFILE_NAMES)
+_prof_total = [0] * len(PROFILE_NAMES)     # us
+_prof_max = [0] * len(PROFILE_NAMES)       # us
+_prof_orig = {}            # name -> original function while profiling
+_loop = [0, 0, 0, 0]       # [iterations, first tick, last tick, max us]
+
+
+def profile(on=True):
+    g = globals()
+    if on and not _prof_orig:
+        for i in range(len(PROFILE_NAMES)):
+            name = PROFILE_NAMES[i]
+            _prof_orig[name] = g[name]
+            g[name] = _prof_wrap(i, g[name])
+    elif not on and _prof_orig:
+        for name in PROFILE_NAMES:
+            g[name] = _prof_orig[name]
+        _prof_orig.clear()
+
+
+def _prof_wrap(i, fn):
+    def timed(*args, **kw):
+        t0 = time.ticks_us()
+        try:
+            return fn(*args, **kw)
+        finally:
+            dt = time.ticks_diff(time.ticks_us(), t0)
+            _prof_calls[i] += 1
+            _prof_total[i] += dt
+            if dt > _prof_max[i]:
+                _prof_max[i] = dt
+    return timed
+
+
+def loop_tick():
+    if not _prof_orig:
+        return
+    now = time.ticks_us()
+    if _loop[0]:
+        dt = time.ticks_diff(now, _loop[2])
+        if dt > _loop[3]:
+            _loop[3] = dt
+    else:
+        _loop[1] = now
+    _loop[2] = now
+    _loop[0] += 1
+
+
+def stats():
+    """
+    {name: (calls, total_us, max_us)} for every profiled function called
+    so far, plus "loop": (iterations, iterations per second, max us) from
+    loop_tick().
+    """
+    result = {}
+    for i in range(len(PROFILE_NAMES)):
+        if _prof_calls[i]:
+            result[PROFILE_NAMES[i]] = (_prof_calls[i], _prof_total[i],
+                                        _prof_max[i])
+    hz = 0
+    if _loop[0] > 1:
+        span = time.ticks_diff(_loop[2], _loop[1])
+        if span > 0:
+            hz = (_loop[0] - 1) * 1000000 // span
+    result["loop"] = (_loop[0], hz, _loop[3])
+    return result
+
+
+def reset_stats():
+    for i in range(len(PROFILE_NAMES)):
+        _prof_calls[i] = 0
+        _prof_total[i] = 0
+        _prof_max[i] = 0
+    for i in range(4):
+        _loop[i] = 0
+
+
+def show_stats(page=None, interval=2):
+    """
+    Show stats() on the OLED, three functions per page, most total time
+    first: label, calls, mean/max us (see _short()). page=None shows every
+    page in turn, interval seconds each, also while stopped; otherwise just
+    that page. Returns the page count.
+    """
+    s = stats()
+    loops, hz, _ = s.pop("loop")
+    rows = sorted(s.items(), key=lambda kv: -kv[1][1])
+    pages = max(1, (len(rows) + 2) // 3)
+    for p in range(pages) if page is None else (page % pages,):
+        lines = ["P%d/%d %dHz" % (p + 1, pages, hz) if loops else
+                 "P%d/%d" % (p + 1, pages), "", "", ""]
+        for k, (name, (calls, total, mx)) in enumerate(rows[p * 3:p * 3 + 3]):
+            label = PROFILE_LABELS[PROFILE_NAMES.index(name)]
+            lines[k + 1] = "%-4s %s %s/%s" % (label, _short(calls),
+                                              _short(total // calls), _short(mx))
+        # Straight to the display so the profiled oled_status() is not counted
+        _oled_post(_oled_draw_status, tuple(lines))
+        oled_flush()
+        if page is None and pages > 1:
+            # Not wait(): it returns at once while stopped, which is when
+            # stats are usually looked at
+            end = time.ticks_add(time.ticks_ms(), int(interval * 1000))
+            while time.ticks_diff(end, time.ticks_ms()) > 0:
+                check_stop()
+                time.sleep_ms(10)
+    return pages
+
+
+def _short(n):
+    # At most 3 characters (999, 99k, .5M, 99M), so a stats row is 16
+    if n < 1000:
+        return str(n)
+    if n < 100000:
+        return "%dk" % (n // 1000)
+    if n < 1000000:
+        return ".%dM" % (n // 100000)
+    if n < 100000000:
+        return "%dM" % (n // 1000000)
+    return "%dG" % (n // 1000000000)
@@ -0,0 +1,163 @@
+import time
+import _thread
+import motor_library as ml
+
+
+# ---------------- Dual-core Mode ----------------
+# start() moves OLED drawing, and any jobs added with add_job() (telemetry,
+# networking), to a worker thread. The calling thread keeps the control
+# side: motors, sensors and STOP. The two sides only talk through
+# mailboxes:
+#   to_control  worker -> control, run inside wait()/movement() polls
+#   to_worker   control -> worker, run on the worker's next tick
+#   state()     latest snapshot published by the control side
+# MicroPython on the ESP32 runs every thread under one interpreter lock,
+# so this keeps slow I2C/network work from stalling the control loop
+# rather than making the two run truly in parallel.
+#
+#     import motor_threads as mt
+#     mt.start(fps=10)
+#     mt.add_job(send_telemetry, 100)
+WORKER_TICK_MS = 10
+COMMANDS_PER_POLL = 8      # to_control messages run per control poll
+
+
+class Mailbox:
+    """
+    Fixed-size single-producer/single-consumer queue. put() and get()
+    never block or take a lock: each side only moves its own index.
+    """
+
+    def __init__(self, size=16):
+        self._buf = [None] * (size + 1)
+        self._head = 0          # next to read, only get() moves it
+        self._tail = 0          # next to write, only put() moves it
+        self.dropped = 0
+
+    def put(self, msg):
+        t = self._tail + 1
+        if t == len(self._buf):
+            t = 0
+        if t == self._head:
+            self.dropped += 1
+            return False        # full
+        self._buf[self._tail] = msg
+        self._tail = t
+        return True
+
+    def get(self):
+        h = self._head
+        if h == self._tail:
+            return None
+        msg = self._buf[h]
+        self._buf[h] = None
+        self._head = h + 1 if h + 1 < len(self._buf) else 0
+        return msg
+
+    def __len__(self):
+        return (self._tail - self._head) % len(self._buf)
+
+
+to_control = Mailbox()
+to_worker = Mailbox()
+
+_state = None
+_jobs = []                 # [fn, period_ms, due_ms]
+_worker_run = False
+_worker_alive = False
+
+
+def send(mailbox, fn, *args):
+    # Queue fn(*args) to run on the other side; False if the mailbox is full
+    return mailbox.put((fn, args))
+
+
+def _run(mailbox, limit):
+    while limit:
+        msg = mailbox.get()
+        if msg is None:
+            return
+        try:
+            msg[0](*msg[1])
+        except Exception as e:
+            print("mailbox:", e)
+        limit -= 1
+
+
+def service():
+    """
+    Control side: run queued to_control commands and publish state().
+    Called on every wait() poll while the worker runs; call it from your
+    own loop if that loop does not wait().
+    """
+    global _state
+    _run(to_control, COMMANDS_PER_POLL)
+    _state = (time.ticks_ms(), ml._running, ml._sensor_mask,
+              ml._sensor_raw[0], ml._sensor_raw[1], ml._sensor_raw[2])
+
+
+def state():
+    """
+    Latest (ticks_ms, running, sensor mask, raw1, raw2, raw3) from the
+    control side, or None before the first service().
+    """
+    return _state
+
+
+def add_job(fn, period_ms):
+    # fn() runs in the worker every period_ms
+    _jobs.append([fn, period_ms, time.ticks_ms()])
+
+
+def remove_job(fn):
+    for i in range(len(_jobs)):
+        if _jobs[i][0] is fn:
+            _jobs.pop(i)
+            return
+
+
+def _worker(fps):
+    global _worker_alive
+    frame = 1000 // fps if fps else 0
+    next_frame = time.ticks_ms()
+    while _worker_run:
+        now = time.ticks_ms()
+        _run(to_worker, -1)
+        if frame and time.ticks_diff(now, next_frame) >= 0:
+            ml.oled_flush()
+            next_frame = time.ticks_add(now, frame)
+        for job in _jobs:
+            if time.ticks_diff(now, job[2]) >= 0:
+                job[2] = time.ticks_add(now, job[1])
+                try:
+                    job[0]()
+                except Exception as e:
+                    print("worker job:", e)
+        time.sleep_ms(WORKER_TICK_MS)
+    _worker_alive = False
+
+
+def start(fps=10):
+    """
+    Start the worker thread. It draws the OLED at up to fps frames a second
+    in place of the OLED timer (fps=0 leaves the display alone).
+    """
+    global _worker_run, _worker_alive
+    if _worker_alive:
+        return
+    if fps:
+        ml.oled_rate(fps, timer=False)
+    ml.add_idle(service)
+    _worker_run = True
+    _worker_alive = True
+    _thread.start_new_thread(_worker, (fps,))
+
+
+def stop():
+    # Stop the worker and hand the display back to the OLED timer
+    global _worker_run
+    _worker_run = False
+    while _worker_alive:
+        time.sleep_ms(WORKER_TICK_MS)
+    ml.remove_idle(service)
+    ml.oled_rate(ml.OLED_MAX_FPS)
@@ -0,0 +1,174 @@
+import time
+import struct
+import socket
+import motor_library as ml
+
+try:
+    from gc import mem_free
+except ImportError:
+    def mem_free():
+        return 0
+
+
+# ---------------- Telemetry ----------------
+# Fixed-size binary records kept in a preallocated ring buffer and sent in
+# batched frames over UDP or a stream (UART, USB serial). Nothing is
+# formatted on the robot; host/telemetry_decode.py turns frames into
+# CSV/NumPy.
+#
+# Record, little-endian, RECORD_SIZE bytes:
+#   t_ms      u32       ticks_ms() when recorded
+#   duty      5 x u16   last duty written to MOTORS[0..4], 0 if absent
+#   dirs      u8        bit i = direction pin of MOTORS[i]
+#   mask      u8        sensor mask, as read_sensors()
+#   raw       3 x u16   sensor readings
+#   loop_us   u16       caller's loop time, or time since the last record
+#   mem_free  u32       gc.mem_free()
+# Frame: b"ET", version u8, frame seq u16, records dropped u16 (both wrap),
+# record count u8, RECORD_SIZE u8, then the records.
+#
+#     import telemetry
+#     telemetry.start("192.168.4.2", rate_hz=50, send_hz=5)
+#     ...
+#     telemetry.poll()   # from the control loop; wait() does it too
+TELEMETRY_PORT = 4211
+MOTORS = ("front_left", "front_right", "back_left", "back_right",
+          "extra_motor")
+VERSION = 1
+
+_REC_FMT = "<I5HBB3HHI"
+RECORD_SIZE = struct.calcsize(_REC_FMT)
+_HDR_FMT = "<2sBHHBB"
+HEADER_SIZE = struct.calcsize(_HDR_FMT)
+BATCH = 36                  # records per frame, ~1 KB
+
+_ring = bytearray(0)
+_capacity = 0
+_head = 0                   # next record slot
+_count = 0                  # records waiting to be sent
+_dropped = 0                # overwritten before they were sent
+_frame = bytearray(HEADER_SIZE + BATCH * RECORD_SIZE)
+_frame_seq = 0
+_duty = [0, 0, 0, 0, 0]
+_last_rec = 0
+_rec_period = 0
+_send_period = 0
+_next_rec = 0
+_next_send = 0
+_sock = None
+_dest = None
+_stream = None
+
+
+def start(host=None, port=TELEMETRY_PORT, stream=None, rate_hz=50,
+          send_hz=5, capacity=256):
+    """
+    Stream to UDP host:port, or write frames to stream (anything with
+    write(), e.g. a machine.UART). rate_hz records are taken by poll() and
+    sent send_hz times a second. Attaches poll() to wait(), alongside
+    any other hook such as motor_threads.
+    """
+    global _ring, _capacity, _head, _count, _dropped, _frame_seq
+    global _rec_period, _send_period, _next_rec, _next_send, _last_rec
+    global _sock, _dest, _stream
+    stop()
+    _ring = bytearray(capacity * RECORD_SIZE)
+    _capacity = capacity
+    _head = 0
+    _count = 0
+    _dropped = 0
+    _frame_seq = 0
+    _rec_period = 1000 // rate_hz
+    _send_period = 1000 // send_hz
+    _next_rec = _next_send = _last_rec = time.ticks_ms()
+    _stream = stream
+    if stream is None:
+        _sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _dest = socket.getaddrinfo(host, port)[0][-1]
+    ml.add_idle(poll)
+
+
+def stop():
+    global _sock, _stream
+    ml.remove_idle(poll)
+    if _capacity:
+        flush()
+    if _sock is not None:
+        _sock.close()
+        _sock = None
+    _stream = None
+
+
+def stats():
+    return {"buffered": _count, "dropped": _dropped, "frames": _frame_seq}
+
+
+def record(loop_us=None):
+    """Add one record now. loop_us defaults to the time since the last one."""
+    global _head, _count, _dropped, _last_rec
+    now = time.ticks_ms()
+    if loop_us is None:
+        loop_us = time.ticks_diff(now, _last_rec) * 1000
+    _last_rec = now
+    d = _duty
+    dirs = 0
+    for i in range(5):
+        m = ml.motors.get(MOTORS[i])
+        d[i] = 0
+        if m is not None:
+            d[i] = m["last_duty"] or 0
+            if m["last_dir"]:
+                dirs |= 1 << i
+    raw = ml._sensor_raw
+    struct.pack_into(_REC_FMT, _ring, _head * RECORD_SIZE, now,
+                     d[0], d[1], d[2], d[3], d[4], dirs, ml._sensor_mask,
+                     raw[0], raw[1], raw[2],
+                     loop_us if loop_us < 0xFFFF else 0xFFFF, mem_free())
+    _head = _head + 1 if _head + 1 < _capacity else 0
+    if _count < _capacity:
+        _count += 1
+    else:
+        _dropped += 1
+
+
+def poll(loop_us=None):
+    # Record and send when due; cheap to call every loop iteration
+    global _next_rec, _next_send
+    now = time.ticks_ms()
+    if time.ticks_diff(now, _next_rec) >= 0:
+        _next_rec = time.ticks_add(_next_rec, _rec_period)
+        if time.ticks_diff(now, _next_rec) > 0:
+            _next_rec = time.ticks_add(now, _rec_period)   # fell behind
+        record(loop_us)
+    if time.ticks_diff(now, _next_send) >= 0:
+        _next_send = time.ticks_add(now, _send_period)
+        flush()
+
+
+def flush():
+    # Send everything buffered, BATCH records per frame
+    global _count, _frame_seq
+    ring = memoryview(_ring)
+    frame = memoryview(_frame)
+    while _count:
+        n = _count if _count < BATCH else BATCH
+        first = _head - _count
+        if first < 0:
+            first += _capacity
+        struct.pack_into(_HDR_FMT, _frame, 0, b"ET", VERSION,
+                         _frame_seq & 0xFFFF, _dropped & 0xFFFF, n,
+                         RECORD_SIZE)
+        off = HEADER_SIZE
+        for k in range(n):
+            j = (first + k) % _capacity * RECORD_SIZE
+            frame[off:off + RECORD_SIZE] = ring[j:j + RECORD_SIZE]
+            off += RECORD_SIZE
+        _count -= n
+        _frame_seq += 1
+        try:
+            if _stream is not None:
+                _stream.write(frame[:off])
+            else:
+                _sock.sendto(frame[:off], _dest)
+        except OSError:
+            pass